@@ -0,0 +1,159 @@
+import os
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from PIL import Image, ImageTk
+
+
+def default_cache_dir():
+    """
+    Devuelve el directorio de caché en disco para las imágenes pre-escaladas.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "centro_multimedia", "assets")
+
+
+class AssetCache:
+    """
+    Caché de imágenes de la interfaz compartida por todo el proceso.
+    Decodifica y redimensiona cada recurso una sola vez y conserva los PhotoImage
+    con desalojo LRU bajo un presupuesto de memoria.
+    """
+    def __init__(self, max_bytes=64 * 1024 * 1024, cache_dir=None):
+        """
+        Inicializa la caché con un presupuesto máximo de memoria en bytes y el
+        directorio donde se guardan las imágenes ya redimensionadas.
+        """
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        self.used_bytes = 0
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, path, size, resample=Image.Resampling.LANCZOS, disco=True):
+        """
+        Devuelve el PhotoImage de `path` redimensionado a `size`, creándolo si no existe.
+        Con `disco=False` no se usa la caché en disco, para imágenes que dependen del
+        contenido del USB (carátulas) y que harían crecer ese directorio sin límite.
+        """
+        key = (path, tuple(size), resample)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                return entry[0]
+
+        img = self.load_image(path, size, resample, disco)
+        photo = ImageTk.PhotoImage(img)
+        cost = img.width * img.height * 4
+
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = (photo, cost)
+                self.used_bytes += cost
+                self.evict()
+            return self.entries[key][0] if key in self.entries else photo
+
+    def load_image(self, path, size, resample, disco=True):
+        """
+        Obtiene la imagen redimensionada, leyéndola del disco si ya fue pre-escalada.
+        En caso contrario abre y redimensiona la imagen de origen y guarda el resultado.
+        """
+        disk_path = self.disk_path(path, size, resample) if disco else None
+        if disk_path and os.path.exists(disk_path):
+            try:
+                with Image.open(disk_path) as img:
+                    img.load()
+                    return img
+            except Exception as e:
+                print(f"Error al leer la caché de imágenes: {e}")
+
+        with Image.open(path) as img:
+            resized = img.resize(tuple(size), resample)
+
+        if disk_path:
+            self.save_to_disk(resized, disk_path)
+        return resized
+
+    def disk_path(self, path, size, resample):
+        """
+        Calcula la ruta en disco de una imagen pre-escalada.
+        El nombre tiene dos partes: la ruta, la resolución y el filtro identifican la
+        entrada, y la fecha de modificación y el tamaño del archivo de origen su versión,
+        por lo que una imagen modificada genera una entrada nueva que reemplaza a la anterior.
+        """
+        if not self.cache_dir:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        entrada = f"{os.path.abspath(path)}|{size[0]}x{size[1]}|{int(resample)}"
+        version = f"{st.st_mtime_ns}|{st.st_size}"
+        name = (hashlib.sha1(entrada.encode("utf-8")).hexdigest() + "-"
+                + hashlib.sha1(version.encode("utf-8")).hexdigest()[:16])
+        return os.path.join(self.cache_dir, name + ".png")
+
+    def save_to_disk(self, img, disk_path):
+        """
+        Guarda la imagen redimensionada de forma atómica en el directorio de caché y borra
+        las versiones anteriores de la misma entrada, para que la caché no crezca cada vez
+        que se modifica un recurso.
+        """
+        tmp_path = f"{disk_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+            img.save(tmp_path, format="PNG", compress_level=1)
+            os.replace(tmp_path, disk_path)
+            self.prune(disk_path)
+        except Exception as e:
+            print(f"Error al guardar la caché de imágenes: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def prune(self, disk_path):
+        """
+        Borra del disco las otras versiones de la entrada de `disk_path`.
+        """
+        name = os.path.basename(disk_path)
+        prefix = name.split("-")[0] + "-"
+        for other in os.listdir(self.cache_dir):
+            if other.startswith(prefix) and other.endswith(".png") and other != name:
+                try:
+                    os.remove(os.path.join(self.cache_dir, other))
+                except OSError:
+                    pass
+
+    def evict(self):
+        """
+        Desaloja las entradas menos usadas hasta respetar el presupuesto de memoria.
+        Siempre conserva la entrada más reciente aunque exceda el presupuesto por sí sola.
+        """
+        while self.used_bytes > self.max_bytes and len(self.entries) > 1:
+            _, (_, cost) = self.entries.popitem(last=False)
+            self.used_bytes -= cost
+
+    def clear(self):
+        """
+        Vacía la caché en memoria (la caché en disco se conserva).
+        """
+        with self.lock:
+            self.entries.clear()
+            self.used_bytes = 0
+
+
+_cache = AssetCache()
+
+
+def get_asset_cache():
+    """
+    Devuelve la instancia de caché compartida por todas las interfaces.
+    """
+    return _cache
+
+
+def cargar_imagen(path, size, resample=Image.Resampling.LANCZOS, disco=True):
+    """
+    Atajo para obtener un PhotoImage cacheado desde la caché compartida.
+    """
+    return _cache.get(path, size, resample, disco)
@@ -1,7 +1,410 @@
+import os
 import tkinter as tk
-from PIL import Image, ImageTk
+from time import monotonic
+from threading import Thread, Event, RLock
+from asset_cache import cargar_imagen
 import vlc
 from screeninfo import get_monitors
+from tk_bridge import TkBridge
+from video_info import formatear_duracion
+from virtual_list import VirtualList
+from music_index import MusicIndex, MetadataService, pista_basica
+from loudness import LoudnessService
+from playlist import Playlist, TypeAheadSearch
+from vlc_player import get_player_service
+
+MODO_AUDIO = os.environ.get("CENTRO_MULTIMEDIA_MODO_AUDIO", "gapless")
+FUNDIDO_MS = int(os.environ.get("CENTRO_MULTIMEDIA_FUNDIDO_MS", "3000"))
+
+
+class MotorAudio:
+    """
+    Motor de reproducción de audio con dos reproductores de libvlc que se alternan.
+    Antes de que termine la canción actual abre la siguiente en el otro reproductor
+    (iniciada en pausa, con el archivo abierto y el decodificador listo) y la arranca:
+    - "normal": sin preparación; la siguiente se abre al terminar la actual.
+    - "gapless": la siguiente arranca `latencia_ms` antes del final de la actual.
+    - "crossfade": la siguiente arranca `crossfade_ms` antes del final y los volúmenes se cruzan.
+    Funciona en su propio hilo, sin depender de Tk; `on_change(index)` se llama desde ese
+    hilo cada vez que empieza otra canción (None al terminar la lista).
+    El hilo duerme sin límite mientras no hay nada que hacer (detenido, en pausa o lejos
+    del final) y solo revisa cada `intervalo` segundos durante un fundido o en los últimos
+    `margen_ms` antes de un cambio.
+    `ganancias` es un diccionario {ruta: dB} con la normalización de cada canción ya
+    calculada; al reproducir solo se consulta.
+    """
+    MODOS = ("normal", "gapless", "crossfade")
+
+    def __init__(self, service, on_change=None, modo="gapless", crossfade_ms=3000, latencia_ms=50,
+                 preparar_ms=5000, intervalo=0.01, margen_ms=250, nombres=("audio", "audio_siguiente"),
+                 ganancias=None):
+        """
+        Crea el motor sobre los reproductores con esos nombres del servicio compartido.
+        """
+        if modo not in self.MODOS:
+            print(f"Modo de audio desconocido: {modo}; se usa gapless")
+            modo = "gapless"
+        self.service = service
+        self.on_change = on_change
+        self.modo = modo
+        self.crossfade_ms = crossfade_ms
+        self.latencia_ms = latencia_ms
+        self.preparar_ms = max(preparar_ms, crossfade_ms + 1000)
+        self.intervalo = intervalo
+        self.margen_ms = margen_ms
+        self.players = [service.player(nombre) for nombre in nombres]
+        self.volumen = 100
+        self.ganancias = ganancias if ganancias is not None else {}
+        self.volumenes = [self.volumen, self.volumen]
+
+        self.paths = []
+        self.proximo = self.proximo_circular
+        self.comenzo = None
+        self.index = None
+        self.actual = 0
+        self.preparado = None
+        self.no_preparar = False
+        self.saliente = None
+        self.inicio_fundido = 0
+        self.pausado = False
+        self.terminados = set()
+        self.errores = set()
+        self.tiempos = [(0, 0.0), (0, 0.0)]
+        self.duraciones = [0, 0]
+
+        self.lock = RLock()
+        self.despertar = Event()
+        self.cerrado = False
+        self.eventos = [
+            vlc.EventType.MediaPlayerEndReached,
+            vlc.EventType.MediaPlayerEncounteredError,
+            vlc.EventType.MediaPlayerTimeChanged,
+            vlc.EventType.MediaPlayerLengthChanged,
+        ]
+        for i, player in enumerate(self.players):
+            for event_type in self.eventos:
+                player.event_manager().event_attach(event_type, self.recibir, i)
+        self.hilo = Thread(target=self.vigilar, daemon=True)
+        self.hilo.start()
+
+    def proximo_circular(self, index):
+        """
+        Devuelve el índice de la canción que sigue a `index`, volviendo al inicio al final.
+        """
+        return (index + 1) % len(self.paths) if self.paths else None
+
+    def volumen_pista(self, index):
+        """
+        Volumen de libvlc (0-200, lineal) para la canción `index` con su ganancia aplicada.
+        """
+        ganancia = self.ganancias.get(self.paths[index], 0.0)
+        return max(0, min(200, round(self.volumen * 10 ** (ganancia / 20))))
+
+    def recibir(self, event, i):
+        """
+        Se ejecuta en el hilo de libvlc: solo guarda el dato del evento y despierta al motor.
+        Los avisos de tiempo no lo despiertan: el motor ya calcula cuándo le toca actuar.
+        """
+        if event.type == vlc.EventType.MediaPlayerTimeChanged:
+            self.tiempos[i] = (event.u.new_time, monotonic())
+            return
+        elif event.type == vlc.EventType.MediaPlayerLengthChanged:
+            self.duraciones[i] = event.u.new_length
+        elif event.type == vlc.EventType.MediaPlayerEndReached:
+            self.terminados.add(i)
+        else:
+            self.errores.add(i)
+        self.despertar.set()
+
+    def posicion(self, i):
+        """
+        Devuelve el tiempo de reproducción del reproductor `i` en milisegundos, a partir del
+        último evento de libvlc más el tiempo transcurrido desde entonces.
+        """
+        tiempo, recibido = self.tiempos[i]
+        if self.pausado or not self.players[i].is_playing():
+            return tiempo
+        return tiempo + int((monotonic() - recibido) * 1000)
+
+    def tiempo(self):
+        """
+        Tiempo de la canción actual en milisegundos.
+        """
+        tiempo = self.posicion(self.actual)
+        return min(tiempo, self.duracion()) if self.duracion() else tiempo
+
+    def duracion(self):
+        """
+        Duración de la canción actual en milisegundos (0 si aún no se conoce).
+        """
+        return self.duraciones[self.actual]
+
+    def reproducir(self, paths, index=0, proximo=None, comenzo=None):
+        """
+        Cambia la lista de canciones y empieza a reproducir `index`.
+        `proximo(index)` decide, sin avanzar, la canción siguiente (None termina la
+        reproducción) y `comenzo(index)` se llama cuando una canción empieza a sonar.
+        """
+        with self.lock:
+            self.paths = paths
+            self.proximo = proximo or self.proximo_circular
+            self.comenzo = comenzo
+        self.saltar(index)
+
+    def replanificar(self):
+        """
+        Descarta la canción preparada si la siguiente cambió (cola o modo aleatorio).
+        """
+        with self.lock:
+            if self.preparado is None or self.index is None:
+                return
+            if self.proximo(self.index) != self.preparado:
+                self.players[1 - self.actual].stop()
+                self.preparado = None
+                self.no_preparar = False
+        self.despertar.set()
+
+    def saltar(self, index):
+        """
+        Detiene lo que suena y empieza a reproducir la canción `index`.
+        """
+        with self.lock:
+            self.iniciar(index)
+        self.notificar(index)
+
+    def siguiente(self):
+        """
+        Pasa a la canción siguiente sin esperar al final de la actual.
+        """
+        with self.lock:
+            index = self.proximo(self.index) if self.index is not None else None
+            self.iniciar(index)
+        self.notificar(index)
+
+    def pausar(self):
+        """
+        Pausa la reproducción (incluida la canción saliente de un fundido).
+        """
+        with self.lock:
+            self.pausado = True
+            for i in (self.actual, self.saliente):
+                if i is not None:
+                    self.tiempos[i] = (self.posicion(i), monotonic())
+                    self.players[i].set_pause(1)
+
+    def reanudar(self):
+        """
+        Reanuda la reproducción pausada.
+        """
+        with self.lock:
+            if self.index is None:
+                return
+            self.pausado = False
+            for i in (self.actual, self.saliente):
+                if i is not None:
+                    self.tiempos[i] = (self.tiempos[i][0], monotonic())
+                    self.players[i].set_pause(0)
+        self.despertar.set()
+
+    def buscar(self, fraccion):
+        """
+        Mueve la canción actual a una fracción de su duración.
+        """
+        with self.lock:
+            player = self.players[self.actual]
+            if self.index is None or self.saliente is not None or not player.is_seekable():
+                return
+            player.set_position(fraccion)
+            self.tiempos[self.actual] = (int(self.duracion() * fraccion), monotonic())
+        self.despertar.set()
+
+    def detener(self):
+        """
+        Detiene ambos reproductores.
+        """
+        with self.lock:
+            self.iniciar(None)
+
+    def cerrar(self):
+        """
+        Detiene la reproducción, elimina los eventos registrados y termina el hilo del motor.
+        """
+        self.detener()
+        self.cerrado = True
+        self.despertar.set()
+        for player in self.players:
+            for event_type in self.eventos:
+                player.event_manager().event_detach(event_type)
+
+    def iniciar(self, index):
+        """
+        Detiene ambos reproductores y, si `index` no es None, arranca esa canción.
+        Debe llamarse con el candado tomado.
+        """
+        for player in self.players:
+            player.stop()
+        self.preparado = None
+        self.no_preparar = False
+        self.saliente = None
+        self.pausado = False
+        self.terminados.clear()
+        self.errores.clear()
+        self.tiempos = [(0, monotonic()), (0, monotonic())]
+        self.duraciones = [0, 0]
+        self.index = index
+        self.despertar.set()
+        if index is None:
+            return
+        if self.comenzo:
+            self.comenzo(index)
+        player = self.players[self.actual]
+        self.service.load(player, self.paths[index])
+        self.volumenes[self.actual] = self.volumen_pista(index)
+        player.audio_set_volume(self.volumenes[self.actual])
+        player.play()
+
+    def preparar(self):
+        """
+        Abre la canción siguiente en el reproductor libre, iniciada en pausa.
+        Debe llamarse con el candado tomado.
+        """
+        siguiente = self.proximo(self.index)
+        if siguiente is None:
+            self.no_preparar = True
+            return
+        libre = 1 - self.actual
+        player = self.players[libre]
+        self.service.load(player, self.paths[siguiente], ":start-paused")
+        self.volumenes[libre] = self.volumen_pista(siguiente)
+        player.audio_set_volume(0 if self.modo == "crossfade" else self.volumenes[libre])
+        self.tiempos[libre] = (0, monotonic())
+        self.duraciones[libre] = 0
+        self.terminados.discard(libre)
+        self.errores.discard(libre)
+        player.play()
+        self.preparado = siguiente
+
+    def cambiar(self):
+        """
+        Arranca la canción preparada y la convierte en la actual; la anterior queda como
+        saliente hasta que termine o acabe el fundido. Debe llamarse con el candado tomado.
+        """
+        libre = 1 - self.actual
+        self.saliente = self.actual
+        self.actual = libre
+        self.index = self.preparado
+        self.preparado = None
+        self.no_preparar = False
+        self.inicio_fundido = monotonic()
+        self.tiempos[libre] = (0, monotonic())
+        self.players[libre].set_pause(0)
+        if self.comenzo:
+            self.comenzo(self.index)
+        return self.index
+
+    def vigilar(self):
+        """
+        Bucle del hilo del motor: prepara, arranca y funde las canciones a tiempo.
+        """
+        espera = None
+        while not self.cerrado:
+            self.despertar.wait(espera)
+            self.despertar.clear()
+            if self.cerrado:
+                return
+            with self.lock:
+                cambio = self.paso()
+                espera = self.espera()
+            if cambio is not False:
+                self.notificar(cambio)
+
+    def espera(self):
+        """
+        Devuelve cuántos segundos puede dormir el motor hasta su próxima tarea, o None si
+        solo debe despertarlo un evento (detenido, en pausa, sin duración conocida o
+        esperando el final de la canción). Debe llamarse con el candado tomado.
+        """
+        if self.index is None or self.pausado:
+            return None
+        if self.saliente is not None:
+            return self.intervalo if self.modo == "crossfade" else None
+        duracion = self.duraciones[self.actual]
+        if self.modo == "normal" or duracion <= 0:
+            return None
+        restante = duracion - self.posicion(self.actual)
+        if self.preparado is None:
+            if self.no_preparar:
+                return None
+            return max(0, restante - self.preparar_ms) / 1000
+        umbral = self.crossfade_ms if self.modo == "crossfade" else self.latencia_ms
+        hasta_cambio = restante - umbral
+        if hasta_cambio > self.margen_ms:
+            return (hasta_cambio - self.margen_ms) / 1000
+        return self.intervalo
+
+    def paso(self):
+        """
+        Revisa el estado de los reproductores. Devuelve el índice de la canción que empezó,
+        None si terminó la lista, o False si no hubo cambio. Debe llamarse con el candado tomado.
+        """
+        if self.index is None or self.pausado:
+            return False
+
+        if self.saliente is not None:
+            fin_fundido = (monotonic() - self.inicio_fundido) * 1000 >= self.crossfade_ms
+            if self.saliente in self.terminados or self.saliente in self.errores or (
+                    self.modo == "crossfade" and fin_fundido):
+                self.players[self.saliente].stop()
+                self.terminados.discard(self.saliente)
+                self.errores.discard(self.saliente)
+                self.saliente = None
+                self.players[self.actual].audio_set_volume(self.volumenes[self.actual])
+            elif self.modo == "crossfade":
+                fraccion = (monotonic() - self.inicio_fundido) * 1000 / max(1, self.crossfade_ms)
+                self.players[self.actual].audio_set_volume(int(self.volumenes[self.actual] * fraccion))
+                self.players[self.saliente].audio_set_volume(int(self.volumenes[self.saliente] * (1 - fraccion)))
+
+        libre = 1 - self.actual
+        if self.preparado is not None and libre in self.errores:
+            print(f"Error al preparar: {self.paths[self.preparado]}")
+            self.players[libre].stop()
+            self.preparado = None
+            self.no_preparar = True
+
+        if self.actual in self.errores or self.actual in self.terminados:
+            self.terminados.discard(self.actual)
+            self.errores.discard(self.actual)
+            # Un aviso tardío de la canción anterior no debe saltar la actual.
+            estado = self.players[self.actual].get_state()
+            if estado not in (vlc.State.Ended, vlc.State.Error):
+                return False
+            if estado == vlc.State.Error:
+                print(f"Error al reproducir: {self.paths[self.index]}")
+            if self.preparado is not None:
+                self.players[self.actual].stop()
+                return self.cambiar()
+            index = self.proximo(self.index)
+            self.iniciar(index)
+            return index
+
+        duracion = self.duraciones[self.actual]
+        if self.modo == "normal" or self.saliente is not None or duracion <= 0:
+            return False
+        restante = duracion - self.posicion(self.actual)
+        if self.preparado is None and not self.no_preparar and restante <= self.preparar_ms:
+            self.preparar()
+        umbral = self.crossfade_ms if self.modo == "crossfade" else self.latencia_ms
+        if self.preparado is not None and restante <= umbral:
+            return self.cambiar()
+        return False
+
+    def notificar(self, index):
+        """
+        Avisa del cambio de canción fuera del candado.
+        """
+        if self.on_change:
+            self.on_change(index)
+
 
 class AudioUSB:
     """
@@ -17,22 +420,60 @@ class AudioUSB:
         self.canciones = canciones
         self.current_song_index = 0
 
-        self.player = vlc.MediaPlayer()
-        self.timer_id = None
-        self.remaining_time = 0
+        self.progreso_id = None
+        self.intervalo_progreso = 250
+        self.arrastrando = False
+        self.barra_progreso = None
+        self.tiempo_label = None
+        self.bridge = TkBridge(self.root, self.cancion_cambiada)
+        self.ganancias = {}
+        self.sonoridad = LoudnessService()
+        self.motor = MotorAudio(get_player_service(), on_change=self.bridge.put,
+                                modo=MODO_AUDIO, crossfade_ms=FUNDIDO_MS, ganancias=self.ganancias)
+
+        self.indice = MusicIndex()
+        self.metadatos = MetadataService()
+        self.bridge_metadatos = TkBridge(self.root, self.metadatos_listos)
+        self.lista = Playlist(canciones)
+        self.buscador = None
+        self.posiciones = {}
+        self.resultados = []
+        self.panel_lista = None
+        self.lista_canciones = None
+        self.encolar_al_tocar = False
+        self.biblioteca = None
+        self.lista_biblioteca = None
+        self.vista = ("artistas", None, None)
+        self.elementos = []
 
         self.current_frame = None
         self.mostrar_interfaz_audio()
+        self.root.after_idle(self.cargar_biblioteca)
+
+    def cargar_biblioteca(self):
+        """
+        Llena el índice con los nombres de archivo y empieza a leer los metadatos y a
+        analizar la sonoridad.
+        Se ejecuta después de dibujar el reproductor para no retrasar la primera pantalla.
+        """
+        if self.current_frame is None:
+            return
+        self.indice.cargar(pista_basica(path) for path in self.canciones)
+        self.metadatos.start(self.canciones, self.bridge_metadatos.put)
+        self.sonoridad.start(self.canciones, self.ganancias.update)
 
     def limpiar_frame(self):
         """
         Limpia la interfaz actual y detiene cualquier reproducción activa.
         """
-        if self.player.is_playing():
-            self.player.stop()
-        if self.timer_id:
-            self.root.after_cancel(self.timer_id)
-            self.timer_id = None
+        self.motor.detener()
+        if self.progreso_id:
+            self.root.after_cancel(self.progreso_id)
+            self.progreso_id = None
+        self.barra_progreso = None
+        self.tiempo_label = None
+        self.cerrar_biblioteca()
+        self.cerrar_lista()
         if self.current_frame:
             for widget in self.current_frame.winfo_children():
                 widget.destroy()
@@ -47,12 +488,13 @@ class AudioUSB:
         monitor = get_monitors()[0]
         screen_width = monitor.width
         screen_height = monitor.height
+        self.screen_width = screen_width
+        self.screen_height = screen_height
 
         self.current_frame = tk.Frame(self.root)
         self.current_frame.pack(fill="both", expand=True)
 
-        fondo_img = Image.open("img_interfaz/Fondo.jpg").resize((screen_width, screen_height), Image.Resampling.LANCZOS)
-        fondo = ImageTk.PhotoImage(fondo_img)
+        fondo = cargar_imagen("img_interfaz/Fondo.jpg", (screen_width, screen_height))
         fondo_label = tk.Label(self.current_frame, image=fondo)
         fondo_label.image = fondo
         fondo_label.place(x=0, y=0, relwidth=1, relheight=1)
@@ -66,17 +508,18 @@ class AudioUSB:
         self.song_title_label = tk.Label(self.current_frame, text="", font=("Arial", 18), fg="white", bg="#003264")
         self.song_title_label.place(x=0, y=screen_height // 10, width=screen_width)
 
-        try:
-            img_size = min(screen_width // 6, screen_height // 6)
-            img = Image.open("img_interfaz/cancion.png").resize((img_size, img_size), Image.Resampling.LANCZOS)
-            self.song_img = ImageTk.PhotoImage(img)
-            song_img_label = tk.Label(self.current_frame, image=self.song_img, bg="#003264")
-            song_img_label.place(x=(screen_width - img_size) // 2, y=screen_height // 4)
-        except Exception as e:
-            print(f"Error al cargar la imagen: {e}")
+        self.song_info_label = tk.Label(self.current_frame, text="", font=("Arial", 12), fg="white", bg="#003264")
+        self.song_info_label.place(x=0, y=screen_height // 10 + screen_height // 20, width=screen_width)
+
+        self.img_size = min(screen_width // 6, screen_height // 6)
+        self.song_img_label = tk.Label(self.current_frame, bg="#003264")
+        self.song_img_label.place(x=(screen_width - self.img_size) // 2, y=screen_height // 4)
+        self.mostrar_caratula(None)
 
         self.crear_botones(screen_width, screen_height)
+        self.crear_barra_progreso(screen_width, screen_height)
         self.reproducir_cancion()
+        self.actualizar_progreso()
 
     def crear_botones(self, screen_width, screen_height):
         """
@@ -87,6 +530,8 @@ class AudioUSB:
             {"text": "Reanudar", "command": self.reanudar_cancion},
             {"text": "Pausar", "command": self.pausar_cancion},
             {"text": "Siguiente", "command": self.siguiente_cancion},
+            {"text": "Biblioteca", "command": self.mostrar_biblioteca},
+            {"text": "Lista", "command": self.mostrar_lista},
             {"text": "Volver", "command": self.volver},
         ]
 
@@ -106,81 +551,517 @@ class AudioUSB:
                 command=btn["command"]
             ).place(x=x_start + i * (button_width + margin_x), y=y_pos, width=button_width, height=button_height)
 
+    def crear_barra_progreso(self, screen_width, screen_height):
+        """
+        Crea la barra de progreso de la canción, que también permite saltar a otra posición.
+        """
+        bar_width = screen_width * 6 // 10
+        bar_height = screen_height // 20
+        x_start = (screen_width - bar_width) // 2
+        y_pos = screen_height // 2 + screen_height // 15 + screen_height // 30
+
+        self.barra_progreso = tk.Scale(
+            self.current_frame,
+            from_=0,
+            to=1000,
+            orient="horizontal",
+            showvalue=0,
+            bg="#003264",
+            troughcolor="#00FFFF",
+            highlightthickness=0
+        )
+        self.barra_progreso.place(x=x_start, y=y_pos, width=bar_width, height=bar_height)
+        self.barra_progreso.bind("<ButtonPress-1>", self.iniciar_arrastre)
+        self.barra_progreso.bind("<ButtonRelease-1>", self.saltar_a_posicion)
+
+        self.tiempo_label = tk.Label(self.current_frame, text="0:00 / 0:00", font=("Arial", 12), fg="white", bg="#003264")
+        self.tiempo_label.place(x=x_start + bar_width + screen_width // 80, y=y_pos)
+
     def reproducir_cancion(self):
         """
-        Inicia la reproducción de la canción seleccionada y configura un temporizador.
+        Inicia la reproducción de la canción seleccionada.
+        El motor de audio pasa solo a la siguiente canción al terminar la actual.
         """
         if self.canciones and 0 <= self.current_song_index < len(self.canciones):
-            song_path = self.canciones[self.current_song_index]
-            media = vlc.Media(song_path)
-            self.player.set_media(media)
-            self.player.play()
-            self.song_title_label.config(text=f"Reproduciendo: {song_path.split('/')[-1]}")
-            self.root.after(1000, self.iniciar_temporizador)
+            self.motor.reproducir(self.canciones, self.current_song_index,
+                                  proximo=self.lista.proximo, comenzo=self.lista.comenzo)
+
+    def cancion_cambiada(self, index):
+        """
+        Actualiza el título cuando el motor empieza otra canción. Se ejecuta en el hilo de Tk.
+        """
+        if index is None or self.current_frame is None:
+            return
+        self.current_song_index = index
+        self.mostrar_pista_actual()
+        if self.lista_canciones:
+            self.actualizar_titulo_lista()
+            self.lista_canciones.refresh()
+
+    def mostrar_pista_actual(self):
+        """
+        Muestra el título, el artista, el álbum y la carátula de la canción actual con los
+        metadatos disponibles; se vuelve a llamar cuando llegan los de esa canción.
+        """
+        song_path = self.canciones[self.current_song_index]
+        pista = self.indice.pistas.get(song_path) or pista_basica(song_path)
+        self.song_title_label.config(text=f"Reproduciendo: {pista.title}")
+        self.song_info_label.config(text=" - ".join(filter(None, (pista.artist, pista.album))))
+        self.mostrar_caratula(pista.cover)
+
+    def mostrar_caratula(self, cover):
+        """
+        Muestra la carátula de la canción o la imagen predeterminada si no tiene.
+        """
+        try:
+            self.song_img = cargar_imagen(cover or "img_interfaz/cancion.png", (self.img_size, self.img_size),
+                                          disco=cover is None)
+            self.song_img_label.config(image=self.song_img)
+        except Exception as e:
+            print(f"Error al cargar la imagen: {e}")
+
+    def metadatos_listos(self, pistas):
+        """
+        Incorpora al índice los metadatos recibidos y actualiza lo que está en pantalla.
+        Se ejecuta en el hilo de Tk.
+        """
+        cambios = [pista.path for pista in pistas if self.indice.actualizar(pista)]
+        if not cambios or self.current_frame is None:
+            return
+        if self.canciones and self.canciones[self.current_song_index] in cambios:
+            self.mostrar_pista_actual()
+        if self.lista_biblioteca:
+            self.elementos = self.elementos_vista()
+            self.lista_biblioteca.set_count(len(self.elementos))
+        if self.buscador:
+            for path in cambios:
+                index = self.posiciones.get(path)
+                if index is not None:
+                    self.buscador.actualizar(index, self.texto_busqueda(path))
+        if self.lista_canciones:
+            self.lista_canciones.refresh()
+
+    def mostrar_biblioteca(self):
+        """
+        Muestra la biblioteca por artistas, álbumes o canciones sobre el reproductor.
+        La música sigue sonando mientras se explora.
+        """
+        if self.biblioteca:
+            return
+        self.cerrar_lista()
+        self.biblioteca = tk.Frame(self.current_frame, bg="#003264")
+        self.biblioteca.place(x=0, y=0, relwidth=1, relheight=1)
+
+        bar_height = self.screen_height // 10
+        button_config = [
+            {"text": "Artistas", "command": lambda: self.cambiar_vista("artistas")},
+            {"text": "Álbumes", "command": lambda: self.cambiar_vista("albumes")},
+            {"text": "Canciones", "command": lambda: self.cambiar_vista("pistas")},
+            {"text": "Cerrar", "command": self.cerrar_biblioteca},
+        ]
+        button_width = self.screen_width // 8
+        margin_x = self.screen_width // 40
+        for i, btn in enumerate(button_config):
+            tk.Button(
+                self.biblioteca,
+                text=btn["text"],
+                font=("Arial", 12),
+                bg="#00FFFF",
+                fg="black",
+                command=btn["command"]
+            ).place(x=margin_x + i * (button_width + margin_x), y=bar_height // 4,
+                    width=button_width, height=bar_height // 2)
+
+        self.titulo_vista = tk.Label(self.biblioteca, text="", font=("Arial", 14), fg="white", bg="#003264", anchor="w")
+        self.titulo_vista.place(x=margin_x, y=bar_height, width=self.screen_width - 2 * margin_x)
+
+        self.lista_biblioteca = VirtualList(
+            self.biblioteca,
+            margin_x,
+            bar_height + self.screen_height // 20,
+            self.screen_width - 2 * margin_x,
+            self.screen_height - bar_height - self.screen_height // 10,
+            self.configurar_boton_biblioteca,
+            row_height=self.screen_height // 15,
+            margin_y=self.screen_height // 100,
+            button_options={"font": ("Arial", 12), "anchor": "w"},
+        )
+        self.cambiar_vista(*self.vista)
+
+    def cambiar_vista(self, tipo, artista=None, album=None):
+        """
+        Cambia la vista de la biblioteca: "artistas", "albumes" (de un artista o todos)
+        o "pistas" (de un álbum, de un artista o todas).
+        """
+        self.vista = (tipo, artista, album)
+        self.elementos = self.elementos_vista()
+        partes = {"artistas": "Artistas", "albumes": "Álbumes", "pistas": "Canciones"}[tipo]
+        if artista is not None:
+            partes += f" - {self.indice.nombre_artista(artista)}"
+        if album is not None:
+            partes += f" - {self.indice.nombre_album(album)}"
+        self.titulo_vista.config(text=f"{partes} ({len(self.elementos)})")
+        self.lista_biblioteca.offset = 0
+        self.lista_biblioteca.set_count(len(self.elementos))
+
+    def elementos_vista(self):
+        """
+        Devuelve los elementos de la vista actual, ya ordenados por el índice.
+        """
+        tipo, artista, album = self.vista
+        if tipo == "artistas":
+            return self.indice.vista_artistas()
+        if tipo == "albumes":
+            return self.indice.vista_albumes(artista)
+        return self.indice.vista_pistas(artista, album)
+
+    def configurar_boton_biblioteca(self, button, index):
+        """
+        Asigna a un botón reutilizado el elemento `index` de la vista actual.
+        """
+        tipo, artista, album = self.vista
+        elemento = self.elementos[index]
+        if tipo == "artistas":
+            texto = self.indice.nombre_artista(elemento)
+            comando = lambda: self.cambiar_vista("albumes", elemento)
+        elif tipo == "albumes":
+            texto = self.indice.nombre_album(elemento)
+            comando = lambda: self.cambiar_vista("pistas", artista, elemento)
+        else:
+            pista = self.indice.pistas[elemento]
+            texto = pista.title
+            if pista.artist:
+                texto += f"  ·  {pista.artist}"
+            if pista.duration:
+                texto += f"  ·  {formatear_duracion(pista.duration)}"
+            comando = lambda: self.reproducir_desde_biblioteca(index)
+        button.config(text=texto, command=comando)
+
+    def reproducir_desde_biblioteca(self, index):
+        """
+        Reproduce las canciones de la vista actual a partir de la elegida.
+        """
+        self.canciones = list(self.elementos)
+        self.current_song_index = index
+        self.lista = Playlist(self.canciones, aleatorio=self.lista.aleatorio, inicio=index)
+        self.buscador = None
+        self.cerrar_biblioteca()
+        self.reproducir_cancion()
+
+    def texto_busqueda(self, path):
+        """
+        Texto con el que se busca una canción: título, artista, álbum y nombre del archivo.
+        """
+        pista = self.indice.pistas.get(path) or pista_basica(path)
+        return " ".join(filter(None, (pista.title, pista.artist, pista.album, os.path.basename(path))))
+
+    def mostrar_lista(self):
+        """
+        Muestra la lista de reproducción con búsqueda incremental. Al tocar una canción se
+        salta a ella o, en modo "Encolar", se agrega a la cola de "reproducir a continuación".
+        """
+        if self.panel_lista:
+            return
+        self.cerrar_biblioteca()
+        if self.buscador is None:
+            self.buscador = TypeAheadSearch(self.texto_busqueda(path) for path in self.canciones)
+            self.posiciones = {path: i for i, path in enumerate(self.canciones)}
+        self.resultados = self.buscador.buscar("")
+
+        self.panel_lista = tk.Frame(self.current_frame, bg="#003264")
+        self.panel_lista.place(x=0, y=0, relwidth=1, relheight=1)
+
+        bar_height = self.screen_height // 10
+        margin_x = self.screen_width // 40
+        button_width = self.screen_width // 8
+
+        self.consulta = tk.StringVar()
+        busqueda = tk.Entry(self.panel_lista, textvariable=self.consulta, font=("Arial", 16))
+        busqueda.place(x=margin_x, y=bar_height // 4, width=self.screen_width // 3, height=bar_height // 2)
+        self.consulta.trace_add("write", lambda *args: self.filtrar_lista())
+        busqueda.focus_set()
+
+        self.boton_aleatorio = tk.Button(self.panel_lista, font=("Arial", 12), bg="#00FFFF", fg="black",
+                                         command=self.cambiar_aleatorio)
+        self.boton_modo = tk.Button(self.panel_lista, font=("Arial", 12), bg="#00FFFF", fg="black",
+                                    command=self.cambiar_modo_lista)
+        cerrar = tk.Button(self.panel_lista, text="Cerrar", font=("Arial", 12), bg="#00FFFF", fg="black",
+                           command=self.cerrar_lista)
+        x = 2 * margin_x + self.screen_width // 3
+        for boton in (self.boton_aleatorio, self.boton_modo, cerrar):
+            boton.place(x=x, y=bar_height // 4, width=button_width, height=bar_height // 2)
+            x += button_width + margin_x
+        self.actualizar_botones_lista()
 
-    def iniciar_temporizador(self):
+        self.titulo_lista = tk.Label(self.panel_lista, text="", font=("Arial", 14), fg="white", bg="#003264", anchor="w")
+        self.titulo_lista.place(x=margin_x, y=bar_height, width=self.screen_width - 2 * margin_x)
+
+        self.lista_canciones = VirtualList(
+            self.panel_lista,
+            margin_x,
+            bar_height + self.screen_height // 20,
+            self.screen_width - 2 * margin_x,
+            self.screen_height - bar_height - self.screen_height // 10,
+            self.configurar_boton_lista,
+            row_height=self.screen_height // 15,
+            margin_y=self.screen_height // 100,
+            button_options={"font": ("Arial", 12), "anchor": "w"},
+        )
+        self.lista_canciones.set_count(len(self.resultados))
+        self.lista_canciones.ensure_visible(self.current_song_index)
+        self.actualizar_titulo_lista()
+
+    def filtrar_lista(self):
+        """
+        Filtra la lista con el texto escrito; se ejecuta en cada pulsación.
+        """
+        self.resultados = self.buscador.buscar(self.consulta.get())
+        self.lista_canciones.offset = 0
+        self.lista_canciones.set_count(len(self.resultados))
+        self.actualizar_titulo_lista()
+
+    def actualizar_titulo_lista(self):
+        """
+        Muestra cuántas canciones coinciden y cuántas hay en la cola.
+        """
+        en_cola = len(self.lista.cola)
+        texto = f"{len(self.resultados)} de {len(self.canciones)} canciones"
+        if en_cola:
+            texto += f"  ·  {en_cola} en cola"
+        self.titulo_lista.config(text=texto)
+
+    def actualizar_botones_lista(self):
+        """
+        Actualiza el texto de los botones de modo aleatorio y de acción al tocar.
+        """
+        self.boton_aleatorio.config(text=f"Aleatorio: {'Sí' if self.lista.aleatorio else 'No'}")
+        self.boton_modo.config(text="Tocar: Encolar" if self.encolar_al_tocar else "Tocar: Reproducir")
+
+    def configurar_boton_lista(self, button, index):
+        """
+        Asigna a un botón reutilizado la canción del resultado `index`.
+        """
+        cancion = self.resultados[index]
+        path = self.canciones[cancion]
+        pista = self.indice.pistas.get(path) or pista_basica(path)
+        texto = f"{cancion + 1}. {pista.title}"
+        if pista.artist:
+            texto += f"  ·  {pista.artist}"
+        posicion = self.lista.en_cola(cancion)
+        if posicion:
+            texto += f"  ·  en cola ({posicion})"
+        button.config(
+            text=texto,
+            bg="#FFD700" if cancion == self.current_song_index else "#00FFFF",
+            command=lambda: self.elegir_de_lista(cancion)
+        )
+
+    def elegir_de_lista(self, cancion):
+        """
+        Salta a la canción elegida o la agrega a la cola, según el modo.
+        """
+        if self.encolar_al_tocar:
+            self.lista.encolar(cancion)
+            self.motor.replanificar()
+            self.actualizar_titulo_lista()
+            self.lista_canciones.refresh()
+        else:
+            self.motor.saltar(cancion)
+
+    def cambiar_aleatorio(self):
+        """
+        Activa o desactiva el modo aleatorio.
+        """
+        self.lista.cambiar_aleatorio(not self.lista.aleatorio, self.current_song_index)
+        self.motor.replanificar()
+        self.actualizar_botones_lista()
+
+    def cambiar_modo_lista(self):
+        """
+        Alterna entre reproducir o encolar la canción tocada.
+        """
+        self.encolar_al_tocar = not self.encolar_al_tocar
+        self.actualizar_botones_lista()
+
+    def cerrar_lista(self):
+        """
+        Cierra la lista de reproducción y vuelve al reproductor.
         """
-        Configura un temporizador para el cambio de canción.
+        if self.panel_lista:
+            self.panel_lista.destroy()
+        self.panel_lista = None
+        self.lista_canciones = None
+
+    def cerrar_biblioteca(self):
+        """
+        Cierra la biblioteca y vuelve al reproductor.
+        """
+        if self.biblioteca:
+            self.biblioteca.destroy()
+        self.biblioteca = None
+        self.lista_biblioteca = None
+
+    def actualizar_progreso(self):
         """
-        duracion = self.player.get_length()
+        Redibuja la barra y el tiempo con la última posición informada por el decodificador.
+        """
+        if self.barra_progreso is None:
+            return
+        tiempo = self.motor.tiempo()
+        duracion = self.motor.duracion()
         if duracion > 0:
-            self.remaining_time = duracion
-            self.timer_id = self.root.after(self.remaining_time, self.siguiente_cancion)
+            if not self.arrastrando:
+                self.barra_progreso.set(int(tiempo * 1000 / duracion))
+            texto = f"{formatear_duracion(tiempo)} / {formatear_duracion(duracion)}"
         else:
-            self.root.after(1000, self.iniciar_temporizador)
+            texto = formatear_duracion(tiempo)
+        self.tiempo_label.config(text=texto)
+        self.progreso_id = self.root.after(self.intervalo_progreso, self.actualizar_progreso)
 
-    def pausar_temporizador(self):
+    def iniciar_arrastre(self, event):
         """
-        Detiene el temporizador actual.
+        Evita que la barra se mueva sola mientras el usuario la arrastra.
         """
-        if self.timer_id:
-            self.root.after_cancel(self.timer_id)
-            self.timer_id = None
+        self.arrastrando = True
 
-    def reanudar_temporizador(self):
+    def saltar_a_posicion(self, event):
         """
-        Reanuda el temporizador pausado.
+        Mueve la reproducción a la posición elegida en la barra.
         """
-        if self.remaining_time > 0:
-            self.timer_id = self.root.after(self.remaining_time, self.siguiente_cancion)
+        self.arrastrando = False
+        if self.motor.duracion() > 0:
+            self.motor.buscar(self.barra_progreso.get() / 1000)
 
     def siguiente_cancion(self):
         """
         Avanza a la siguiente canción de la lista.
         """
-        self.pausar_temporizador()
         if self.canciones:
-            self.current_song_index = (self.current_song_index + 1) % len(self.canciones)
-            self.reproducir_cancion()
+            self.motor.siguiente()
 
     def cancion_anterior(self):
         """
         Retrocede a la canción anterior en la lista.
         """
-        self.pausar_temporizador()
         if self.canciones:
-            self.current_song_index = (self.current_song_index - 1) % len(self.canciones)
-            self.reproducir_cancion()
+            self.motor.saltar(self.lista.anterior(self.current_song_index))
 
     def pausar_cancion(self):
         """
         Pausa la canción en reproducción.
         """
-        self.player.pause()
-        if self.timer_id:
-            self.remaining_time -= 1000
-        self.pausar_temporizador()
+        self.motor.pausar()
 
     def reanudar_cancion(self):
         """
         Reanuda la canción pausada.
         """
-        self.player.play()
-        self.reanudar_temporizador()
+        self.motor.reanudar()
 
     def volver(self):
         """
         Regresa a la interfaz anterior definida por el callback.
         """
+        self.motor.cerrar()
+        self.bridge.cerrar()
+        self.metadatos.close()
+        self.sonoridad.close()
+        self.bridge_metadatos.cerrar()
         self.limpiar_frame()
         self.volver_callback()
+
+
+def generar_pistas(directorio, pistas=3, segundos=4, frecuencia=44100):
+    """
+    Genera archivos WAV de prueba: tonos continuos, sin silencio al inicio ni al final.
+    """
+    import math
+    import wave
+    from array import array
+
+    onda = array("h", (
+        int(12000 * math.cos(2 * math.pi * 440 * n / frecuencia)) or 1
+        for n in range(frecuencia)
+    ))
+    paths = []
+    for k in range(pistas):
+        path = os.path.join(directorio, f"pista{k + 1}.wav")
+        with wave.open(path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(frecuencia)
+            for _ in range(segundos):
+                f.writeframes(onda.tobytes())
+        paths.append(path)
+    return paths
+
+
+def medir_silencios(paths, modo, crossfade_ms=3000, latencia_ms=50, frecuencia=44100):
+    """
+    Reproduce las pistas con el motor capturando la salida de audio de ambos reproductores
+    y devuelve el silencio entre cada par de pistas en milisegundos (negativo si se solapan).
+    Cada reproductor toca pistas alternas, así que las pistas se separan por reproductor y
+    por los huecos largos entre sus bloques de audio.
+    """
+    import ctypes
+    from array import array
+    from vlc_player import PlayerService
+
+    service = PlayerService(["--no-video"])
+    bloques = ([], [])
+
+    def capturador(i):
+        def capturar(data, samples, count, pts):
+            muestras = array("h", ctypes.string_at(samples, count * 2))
+            sonoras = [n for n, muestra in enumerate(muestras) if muestra]
+            if sonoras:
+                bloques[i].append((pts + sonoras[0] * 1000000 // frecuencia,
+                                   pts + (sonoras[-1] + 1) * 1000000 // frecuencia))
+        return vlc.CallbackDecorators.AudioPlayCb(capturar)
+
+    callbacks = [capturador(0), capturador(1)]
+    for callback, nombre in zip(callbacks, ("audio", "audio_siguiente")):
+        player = service.player(nombre)
+        player.audio_set_callbacks(callback, None, None, None, None, None)
+        player.audio_set_format("S16N", frecuencia, 1)
+
+    terminado = Event()
+    motor = MotorAudio(service, on_change=lambda index: terminado.set() if index is None else None,
+                       modo=modo, crossfade_ms=crossfade_ms, latencia_ms=latencia_ms)
+    motor.reproducir(paths, 0, proximo=lambda index: index + 1 if index + 1 < len(paths) else None)
+    terminado.wait(len(paths) * 30)
+    motor.cerrar()
+    service.release()
+
+    pistas = []
+    for lista in bloques:
+        for inicio, fin in sorted(lista):
+            if pistas and pistas[-1][2] is lista and inicio - pistas[-1][1] < 500000:
+                pistas[-1][1] = max(pistas[-1][1], fin)
+            else:
+                pistas.append([inicio, fin, lista])
+    pistas.sort(key=lambda pista: pista[0])
+    return [(b[0] - a[1]) / 1000 for a, b in zip(pistas, pistas[1:])]
+
+
+# Prueba sin pantalla del motor de audio: genera pistas WAV y mide el silencio entre ellas.
+# Uso: python audio_usb.py [normal|gapless|crossfade] [CROSSFADE_MS] [LATENCIA_MS]
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    modo = sys.argv[1] if len(sys.argv) > 1 else "gapless"
+    crossfade_ms = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    latencia_ms = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    with tempfile.TemporaryDirectory() as directorio:
+        paths = generar_pistas(directorio)
+        silencios = medir_silencios(paths, modo, crossfade_ms, latencia_ms)
+    if len(silencios) != len(paths) - 1:
+        print(f"Se detectaron {len(silencios) + 1} pistas de {len(paths)}")
+    for k, silencio in enumerate(silencios, start=1):
+        if silencio >= 0:
+            print(f"Pista {k} -> {k + 1}: {silencio:.1f} ms de silencio")
+        else:
+            print(f"Pista {k} -> {k + 1}: {-silencio:.1f} ms de solapamiento")
+
@@ -0,0 +1,122 @@
+from threading import Thread, Lock
+from media_manager import MediaManager
+from media_library import MediaLibrary
+
+
+class DeviceService:
+    """
+    Servicio único de la aplicación para monitorear dispositivos USB.
+    Mantiene un solo monitor de pyudev, conserva en una MediaLibrary los archivos
+    multimedia de todas las particiones montadas y reparte las vistas combinadas a
+    cualquier número de suscriptores.
+    """
+    def __init__(self, media_manager=None):
+        """
+        Inicializa el servicio sin arrancar todavía el hilo de monitoreo.
+        """
+        self.media_manager = media_manager or MediaManager()
+        self.lock = Lock()
+        self.subscribers = []
+        self.thread = None
+        self.library = MediaLibrary()
+
+    def start(self):
+        """
+        Arranca el hilo de monitoreo si aún no está en marcha.
+        """
+        with self.lock:
+            if self.thread is None:
+                self.thread = Thread(target=self.media_manager.monitor_devices, args=(self,), daemon=True)
+                self.thread.start()
+
+    def subscribe(self, queue):
+        """
+        Suscribe una cola (o cualquier objeto con método put, como TkBridge) a las
+        actualizaciones y le entrega de inmediato el estado actual.
+        """
+        self.start()
+        with self.lock:
+            if queue not in self.subscribers:
+                self.subscribers.append(queue)
+            state = ("update",) + self.library.snapshot()
+        queue.put(state)
+
+    def unsubscribe(self, queue):
+        """
+        Elimina una cola de la lista de suscriptores.
+        """
+        with self.lock:
+            if queue in self.subscribers:
+                self.subscribers.remove(queue)
+
+    def put(self, event):
+        """
+        Recibe un evento del monitor (misma interfaz que Queue.put) con la forma
+        (action, device, images, audio_files, video_files), lo aplica a la biblioteca
+        y envía a los suscriptores ("update", images, audio_files, video_files).
+        Las listas enviadas se comparten entre suscriptores y no deben modificarse.
+        Los suscriptores se notifican fuera del candado para no bloquear al hilo de Tk.
+        """
+        with self.lock:
+            self.library.apply(*event)
+            state = ("update",) + self.library.snapshot()
+            subscribers = list(self.subscribers)
+        for queue in subscribers:
+            queue.put(state)
+
+
+_service = None
+_service_lock = Lock()
+
+
+def get_device_service():
+    """
+    Devuelve la instancia única del servicio de dispositivos.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = DeviceService()
+        return _service
+
+
+# Prueba de fugas: suscribe y desuscribe muchas veces, como al entrar y salir de la
+# pantalla USB, con un monitor simulado, y compara los hilos y descriptores abiertos.
+if __name__ == "__main__":
+    import os
+    import sys
+    import threading
+    from queue import Queue
+
+    class MonitorSimulado:
+        """
+        Sustituto del MediaManager: envía un dispositivo y se bloquea como el socket de udev.
+        """
+        def monitor_devices(self, queue):
+            queue.put(("add", "sdz1", ["/media/usb/foto.jpg"], ["/media/usb/cancion.mp3"], []))
+            threading.Event().wait()
+
+    def descriptores():
+        return len(os.listdir("/proc/self/fd"))
+
+    visitas = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    service = DeviceService(media_manager=MonitorSimulado())
+
+    # La primera visita arranca el hilo del monitor, que vive mientras dure la aplicación.
+    cola = Queue()
+    service.subscribe(cola)
+    service.unsubscribe(cola)
+    hilos, fds = threading.active_count(), descriptores()
+
+    for _ in range(visitas):
+        cola = Queue()
+        service.subscribe(cola)
+        estado = cola.get(timeout=5)
+        service.unsubscribe(cola)
+
+    print(f"{visitas} visitas: hilos {hilos} -> {threading.active_count()}, "
+          f"descriptores {fds} -> {descriptores()}, suscriptores {len(service.subscribers)}")
+    print(f"Último estado: {len(estado[1])} imágenes, {len(estado[2])} canciones")
+    assert threading.active_count() == hilos, "crecieron los hilos"
+    assert descriptores() == fds, "crecieron los descriptores"
+    assert not service.subscribers, "quedaron suscriptores"
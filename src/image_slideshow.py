@@ -1,22 +1,203 @@
 import tkinter as tk
-from PIL import Image, ImageTk
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import perf_counter
+from PIL import Image, ImageOps, ImageTk
 from screeninfo import get_monitors
+from tk_bridge import TkBridge
+
+
+MAX_BYTES_DIAPOSITIVA = 128 * 1024 * 1024
+
+AJUSTES = ("contain", "cover", "stretch")
+
+FILTROS = {
+    "alta": Image.Resampling.LANCZOS,
+    "media": Image.Resampling.BICUBIC,
+    "rapida": Image.Resampling.BILINEAR,
+}
+NIVELES = ["alta", "media", "rapida"]
+
+ORIENTACION_EXIF = 0x0112
+
+
+def calcular_tamano(ancho, alto, size, ajuste):
+    """
+    Calcula el tamaño al que se escala la imagen según el modo de ajuste:
+    "contain" la muestra completa, "cover" llena la pantalla (se recorta después)
+    y "stretch" la estira al tamaño exacto de la pantalla.
+    """
+    if ajuste == "stretch":
+        return size
+    escalas = (size[0] / ancho, size[1] / alto)
+    escala = min(escalas) if ajuste == "contain" else max(escalas)
+    return max(1, round(ancho * escala)), max(1, round(alto * escala))
+
+
+def elegir_filtro(escala, calidad, reducida):
+    """
+    Elige el filtro del remuestreo final según la proporción `escala` entre la imagen
+    de origen y la pantalla y el nivel de `calidad`. Si la imagen ya se redujo por un
+    factor entero (borrador DCT o `reduce`) a menos del doble del destino, basta con
+    BILINEAR; cerca de 1:1 se usa el filtro del nivel (LANCZOS en calidad alta).
+    """
+    if reducida and escala >= 2:
+        return FILTROS["rapida"]
+    return FILTROS[calidad]
+
+
+def cargar_diapositiva(image_path, size, max_bytes=MAX_BYTES_DIAPOSITIVA, draft=True,
+                       ajuste="contain", calidad="alta"):
+    """
+    Decodifica y escala una imagen al tamaño de la pantalla. Se ejecuta en un hilo de trabajo.
+    Los JPEG se decodifican en modo borrador (escalado DCT) a la menor escala que cubre
+    la pantalla y después se reducen por un factor entero antes del remuestreo final.
+    Aplica la orientación EXIF y el modo de ajuste; el filtro depende de la proporción
+    de escala y del nivel de `calidad`.
+    Devuelve (imagen, bytes decodificados) y rechaza imágenes que superen `max_bytes`.
+    """
+    with Image.open(image_path) as img:
+        orientacion = img.getexif().get(ORIENTACION_EXIF, 1)
+        girada = orientacion in (5, 6, 7, 8)
+        ancho, alto = (img.height, img.width) if girada else img.size
+        destino = calcular_tamano(ancho, alto, size, ajuste)
+        escala = min(ancho / destino[0], alto / destino[1])
+        if draft:
+            img.draft("RGB", (destino[1], destino[0]) if girada else destino)
+        decoded_bytes = img.width * img.height * len(img.getbands())
+        if max_bytes and decoded_bytes > max_bytes:
+            raise ValueError(
+                f"la imagen ocupa {decoded_bytes // (1024 * 1024)} MB decodificada "
+                f"(máximo {max_bytes // (1024 * 1024)} MB)"
+            )
+        img.load()
+        if orientacion != 1:
+            img = ImageOps.exif_transpose(img)
+
+    factor = min(img.width // destino[0], img.height // destino[1])
+    if draft and factor > 1:
+        img = img.reduce(factor)
+    if img.size != destino:
+        img = img.resize(destino, elegir_filtro(escala, calidad, draft))
+
+    if ajuste == "cover":
+        x = (img.width - size[0]) // 2
+        y = (img.height - size[1]) // 2
+        img = img.crop((x, y, x + size[0], y + size[1]))
+    return img, decoded_bytes
+
+
+class SlidePrefetcher:
+    """
+    Clase para decodificar y escalar por adelantado las siguientes diapositivas.
+    Mantiene como máximo `ahead` imágenes pendientes o listas (contrapresión) y
+    cancela el trabajo que queda fuera de la ventana o al cerrarse.
+    Con calidad "auto" baja o sube el nivel de filtro según el tiempo que tarda cada
+    diapositiva frente al presupuesto por cuadro `presupuesto` (en segundos).
+    """
+    def __init__(self, image_paths, size, on_ready, ahead=3, workers=2,
+                 ajuste="contain", calidad="auto", presupuesto=1.0):
+        """
+        Inicializa el grupo de hilos. `on_ready(index)` se llama desde un hilo de trabajo
+        cuando una diapositiva termina de cargarse.
+        """
+        self.image_paths = image_paths
+        self.size = size
+        self.on_ready = on_ready
+        self.ahead = ahead
+        self.ajuste = ajuste
+        self.calidad = calidad
+        self.presupuesto = presupuesto
+        self.nivel = 0
+        self.lock = Lock()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.futures = {}
+        self.peak_bytes = 0
+
+    def request(self, index):
+        """
+        Asegura que se estén cargando las diapositivas desde `index` hasta `index + ahead`
+        y descarta las que quedaron fuera de esa ventana.
+        """
+        total = len(self.image_paths)
+        window = [(index + k) % total for k in range(min(self.ahead, total))]
+
+        for i in list(self.futures):
+            if i not in window:
+                self.futures.pop(i).cancel()
+
+        for i in window:
+            if i not in self.futures:
+                future = self.executor.submit(self.cargar, self.image_paths[i])
+                future.add_done_callback(lambda f, i=i: self.on_ready(i) if not f.cancelled() else None)
+                self.futures[i] = future
+
+    def cargar(self, image_path):
+        """
+        Carga una diapositiva, registra la memoria máxima usada al decodificar y ajusta
+        el nivel de calidad automático según el tiempo empleado.
+        Los dos hilos de trabajo comparten el nivel, así que se lee y cambia con el candado.
+        """
+        with self.lock:
+            calidad = NIVELES[self.nivel] if self.calidad == "auto" else self.calidad
+        inicio = perf_counter()
+        img, decoded_bytes = cargar_diapositiva(image_path, self.size, ajuste=self.ajuste, calidad=calidad)
+        duracion = perf_counter() - inicio
+
+        with self.lock:
+            self.peak_bytes = max(self.peak_bytes, decoded_bytes)
+            if self.calidad == "auto":
+                if duracion > self.presupuesto and self.nivel < len(NIVELES) - 1:
+                    self.nivel += 1
+                elif duracion < self.presupuesto / 4 and self.nivel > 0:
+                    self.nivel -= 1
+        return img
+
+    def take(self, index):
+        """
+        Devuelve el Future de una diapositiva si ya terminó, o None.
+        Permanece en el búfer hasta que queda fuera de la ventana de `request`.
+        """
+        future = self.futures.get(index)
+        if future is None or not future.done():
+            return None
+        return future
+
+    def close(self):
+        """
+        Cancela las cargas pendientes y libera el grupo de hilos sin esperar.
+        """
+        for future in self.futures.values():
+            future.cancel()
+        self.futures.clear()
+        self.executor.shutdown(wait=False)
+
 
 class ImageSlideshow:
     """
     Clase para gestionar una presentación de imágenes en pantalla completa.
     Permite cambiar imágenes automáticamente y regresar a una interfaz previa.
     """
-    def __init__(self, root, image_paths, volver_callback):
+    def __init__(self, root, image_paths, volver_callback, ajuste="contain", calidad="auto", inicio=0):
         """
         Inicializa los parámetros de la presentación, como las rutas de imágenes y el callback.
+        `ajuste` es uno de AJUSTES, `calidad` un nivel de NIVELES o "auto" e `inicio` el
+        índice de la primera imagen.
         """
         self.root = root
         self.image_paths = image_paths
         self.volver_callback = volver_callback
+        self.ajuste = ajuste
+        self.calidad = calidad
+        self.intervalo = 5000
         self.current_frame = None
-        self.current_image_index = 0
+        self.current_image_index = inicio
         self.slideshow_running = True
+        self.esperando = False
+        self.fallidas = 0
+        self.after_id = None
+        self.prefetcher = None
+        self.bridge = None
 
         monitor = get_monitors()[0]
         self.screen_width = monitor.width
@@ -45,35 +226,129 @@ class ImageSlideshow:
         )
         volver_btn.place(relx=0.9, rely=0.9, anchor="center")
 
+        if self.image_paths:
+            self.bridge = TkBridge(self.root, self.imagen_lista)
+            self.prefetcher = SlidePrefetcher(
+                self.image_paths, (self.screen_width, self.screen_height), self.bridge.put,
+                ajuste=self.ajuste, calidad=self.calidad, presupuesto=self.intervalo / 1000 / 4,
+            )
+            self.prefetcher.request(self.current_image_index)
         self.cambiar_imagen()
 
     def cambiar_imagen(self):
         """
         Cambia la imagen mostrada de forma cíclica cada 5 segundos.
+        Si la siguiente imagen aún no está lista, espera a que el hilo de carga la entregue.
         """
+        self.after_id = None
         if self.slideshow_running and self.image_paths:
-            image_path = self.image_paths[self.current_image_index]
-            img = Image.open(image_path).resize(
-                (self.screen_width, self.screen_height), Image.Resampling.LANCZOS
-            )
-            img_tk = ImageTk.PhotoImage(img)
+            self.esperando = True
+            self.imagen_lista(self.current_image_index)
+
+    def imagen_lista(self, index):
+        """
+        Muestra la diapositiva `index` si es la que se está esperando y ya está cargada.
+        Solo crea el PhotoImage en el hilo de Tk; la decodificación ya se hizo antes.
+        """
+        if not (self.slideshow_running and self.esperando and index == self.current_image_index):
+            return
+        future = self.prefetcher.take(index)
+        if future is None:
+            return
+
+        self.esperando = False
+        self.current_image_index = (self.current_image_index + 1) % len(self.image_paths)
+        self.prefetcher.request(self.current_image_index)
+
+        try:
+            img_tk = ImageTk.PhotoImage(future.result())
             self.image_label.config(image=img_tk)
             self.image_label.image = img_tk
-
-            self.current_image_index = (self.current_image_index + 1) % len(self.image_paths)
-            self.root.after(5000, self.cambiar_imagen)
+            self.after_id = self.root.after(self.intervalo, self.cambiar_imagen)
+            self.fallidas = 0
+        except Exception as e:
+            print(f"Error al cargar la imagen {self.image_paths[index]}: {e}")
+            # Se descarta el resultado fallido y se pasa a la siguiente desde el bucle de Tk,
+            # sin recursión; si ninguna imagen de la vuelta se pudo cargar, se detiene.
+            self.prefetcher.futures.pop(index, None)
+            self.fallidas += 1
+            if self.fallidas >= len(self.image_paths):
+                self.slideshow_running = False
+                self.image_label.config(
+                    image="", text="No se pudo cargar ninguna imagen", fg="white", font=("Arial", 24)
+                )
+                self.image_label.image = None
+                return
+            self.after_id = self.root.after(0, self.cambiar_imagen)
 
     def volver(self):
         """
-        Detiene la presentación y regresa a la interfaz anterior mediante el callback.
+        Detiene la presentación, cancela las cargas pendientes y regresa a la interfaz
+        anterior mediante el callback.
         """
         self.slideshow_running = False
+        if self.after_id:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        if self.prefetcher:
+            self.prefetcher.close()
+            print(f"Memoria máxima por diapositiva: {self.prefetcher.peak_bytes / (1024 * 1024):.1f} MB")
+        if self.bridge:
+            self.bridge.cerrar()
         self.current_frame.destroy()
         self.volver_callback()
 
 
+def generar_imagenes(directorio, cantidad=4, size=(6000, 4000)):
+    """
+    Genera JPEG sintéticos de gran tamaño para el benchmark.
+    """
+    import os
+
+    for i in range(cantidad):
+        ruido = Image.effect_noise((size[0] // 4, size[1] // 4), 40 + i * 10).convert("RGB")
+        ruido.resize(size, Image.Resampling.BILINEAR).save(os.path.join(directorio, f"{i}.jpg"), quality=90)
+
+
+def benchmark(directorio, size, draft):
+    """
+    Decodifica todas las imágenes de `directorio` y devuelve (latencia media en ms, RSS máximo en MB).
+    Se ejecuta en un proceso aparte para medir el RSS de cada modo por separado.
+    """
+    import os
+    import resource
+    from time import perf_counter
+
+    rutas = sorted(os.path.join(directorio, nombre) for nombre in os.listdir(directorio))
+    inicio = perf_counter()
+    for ruta in rutas:
+        cargar_diapositiva(ruta, size, max_bytes=None, draft=draft)
+    latencia = (perf_counter() - inicio) * 1000 / len(rutas)
+    return latencia, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
 # Código para probar la clase
 if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        # Compara la decodificación completa con la decodificación en modo borrador
+        # sobre JPEG sintéticos de 6000x4000 escalados a 1920x1080. Cada paso se ejecuta
+        # en su propio proceso porque el RSS máximo se hereda a través de fork/exec.
+        import tempfile
+        from multiprocessing import get_context
+
+        with tempfile.TemporaryDirectory() as tmp:
+            ctx = get_context("spawn")
+            with ctx.Pool(1) as pool:
+                pool.apply(generar_imagenes, (tmp,))
+            for draft in (False, True):
+                with ctx.Pool(1) as pool:
+                    latencia, rss = pool.apply(benchmark, (tmp, (1920, 1080), draft))
+                modo = "borrador + reduce" if draft else "completa"
+                print(f"Decodificación {modo}: {latencia:.0f} ms por imagen, RSS máximo {rss:.0f} MB")
+        sys.exit(0)
+
     def volver_a_menu():
         print("Regresando al menú principal...")
 
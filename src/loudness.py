@@ -0,0 +1,364 @@
+import os
+import re
+import math
+import wave
+import shutil
+import sqlite3
+import hashlib
+import subprocess as sp
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from threading import Thread, Lock
+
+
+SONORIDAD_OBJETIVO = -18.0
+TECHO_PICO = -1.0
+
+
+def default_cache_dir():
+    """
+    Devuelve el directorio de caché de la biblioteca musical.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "centro_multimedia", "musica")
+
+
+def huella(path, bloque=65536):
+    """
+    Devuelve la huella del contenido de un archivo: sha1 del tamaño y de sus primeros y
+    últimos 64 KB. No depende de la ruta, así que sirve aunque el USB se monte en otro lugar.
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            h = hashlib.sha1(str(size).encode("ascii"))
+            f.seek(0)
+            h.update(f.read(bloque))
+            if size > bloque:
+                f.seek(max(bloque, size - bloque))
+                h.update(f.read(bloque))
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+def coeficientes_k(fs):
+    """
+    Coeficientes de los dos filtros de ponderación K de ITU-R BS.1770 (estante alto y
+    pasa altos) para la frecuencia de muestreo `fs`: [(b0, b1, b2, a1, a2), ...].
+    """
+    k = math.tan(math.pi * 1681.974450955533 / fs)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    estante = ((vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0,
+               2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0)
+
+    k = math.tan(math.pi * 38.13547087602444 / fs)
+    q = 0.5003270373238773
+    a0 = 1 + k / q + k * k
+    pasa_altos = (1.0, -2.0, 1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0)
+    return [estante, pasa_altos]
+
+
+def energias_canal(muestras, fs, escala):
+    """
+    Filtra un canal con la ponderación K y devuelve la energía media de cada segmento
+    de 100 ms.
+    """
+    (b0, b1, b2, a1, a2), (c0, c1, c2, d1, d2) = coeficientes_k(fs)
+    s1 = s2 = t1 = t2 = 0.0
+    segmento = fs // 10
+    energias = []
+    suma = 0.0
+    n = 0
+    for x in muestras:
+        x *= escala
+        y = b0 * x + s1
+        s1 = b1 * x - a1 * y + s2
+        s2 = b2 * x - a2 * y
+        z = c0 * y + t1
+        t1 = c1 * y - d1 * z + t2
+        t2 = c2 * y - d2 * z
+        suma += z * z
+        n += 1
+        if n == segmento:
+            energias.append(suma / segmento)
+            suma = 0.0
+            n = 0
+    return energias
+
+
+def sonoridad_integrada(energias_por_canal):
+    """
+    Calcula la sonoridad integrada (LUFS) a partir de las energías de 100 ms de cada canal,
+    con bloques de 400 ms solapados al 75 % y las compuertas absoluta (-70 LUFS) y relativa (-10 LU).
+    """
+    segmentos = min(len(e) for e in energias_por_canal)
+    bloques = []
+    for i in range(segmentos - 3):
+        bloques.append(sum(sum(e[i:i + 4]) / 4 for e in energias_por_canal))
+
+    def lufs(energia):
+        return -0.691 + 10 * math.log10(energia) if energia > 0 else float("-inf")
+
+    bloques = [b for b in bloques if lufs(b) > -70]
+    if not bloques:
+        return None
+    umbral = lufs(sum(bloques) / len(bloques)) - 10
+    bloques = [b for b in bloques if lufs(b) > umbral]
+    return lufs(sum(bloques) / len(bloques))
+
+
+def analizar_wav(path):
+    """
+    Mide la sonoridad integrada y el pico de muestra de un WAV PCM de 16 bits en Python.
+    Devuelve (LUFS, pico en dBFS) o None si el formato no es compatible.
+    """
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            return None
+        canales = f.getnchannels()
+        fs = f.getframerate()
+        muestras = array("h", f.readframes(f.getnframes()))
+    if not muestras:
+        return None
+    pico = max(max(muestras), -min(muestras)) / 32768
+    energias = [energias_canal(muestras[c::canales], fs, 1 / 32768) for c in range(canales)]
+    return sonoridad_integrada(energias), 20 * math.log10(pico) if pico > 0 else None
+
+
+def analizar_ffmpeg(path, ffmpeg, timeout=600):
+    """
+    Mide la sonoridad integrada y el pico verdadero con el filtro ebur128 de ffmpeg.
+    """
+    cp = sp.run(
+        [ffmpeg, "-nostats", "-hide_banner", "-i", path, "-map", "0:a:0",
+         "-af", "ebur128=peak=true", "-f", "null", "-"],
+        capture_output=True, text=True, timeout=timeout
+    )
+    integrada = re.findall(r"I:\s+(-?[\d.]+) LUFS", cp.stderr)
+    pico = re.findall(r"Peak:\s+(-?[\d.]+|-inf) dBFS", cp.stderr)
+    if cp.returncode != 0 or not integrada:
+        return None
+    return float(integrada[-1]), float(pico[-1]) if pico and pico[-1] != "-inf" else None
+
+
+def analizar(path):
+    """
+    Mide la sonoridad de una canción: con ffmpeg si está instalado, o en Python si es un
+    WAV PCM. Devuelve (LUFS, pico en dBFS) o None. Se ejecuta en un proceso del grupo.
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg:
+        return analizar_ffmpeg(path, ffmpeg)
+    if path.lower().endswith(".wav"):
+        return analizar_wav(path)
+    return None
+
+
+def calcular_ganancia(sonoridad, pico, objetivo=SONORIDAD_OBJETIVO, techo=TECHO_PICO):
+    """
+    Devuelve la ganancia en dB para llevar la canción a la sonoridad objetivo sin que
+    el pico supere el techo.
+    """
+    if sonoridad is None or math.isinf(sonoridad):
+        return 0.0
+    ganancia = objetivo - sonoridad
+    if pico is not None:
+        ganancia = min(ganancia, techo - pico)
+    return ganancia
+
+
+class LoudnessService:
+    """
+    Servicio para analizar la sonoridad (EBU R128) de las canciones en segundo plano.
+    El análisis se hace en un grupo de procesos de baja prioridad y el resultado se guarda
+    en SQLite según la huella del contenido del archivo, así que al reproducir solo se
+    consulta la ganancia ya calculada.
+    """
+    def __init__(self, cache_dir=None, workers=None, batch_size=500):
+        """
+        Inicializa el servicio y crea la tabla si no existe.
+        El grupo de procesos se crea la primera vez que hay algo que analizar.
+        """
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.db_path = os.path.join(self.cache_dir, "sonoridad.sqlite")
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.batch_size = batch_size
+        self.executor = None
+        self.lock = Lock()
+        self.futures = []
+        self.generacion = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        con = self.connect()
+        try:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS loudness ("
+                "hash TEXT PRIMARY KEY, loudness REAL, peak REAL)"
+            )
+            con.commit()
+        finally:
+            con.close()
+
+    def connect(self):
+        """
+        Abre una conexión nueva; cada hilo usa la suya.
+        """
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def start(self, paths, callback):
+        """
+        Cancela el trabajo anterior y empieza a obtener la ganancia de `paths`.
+        `callback({ruta: ganancia en dB})` se llama desde hilos de trabajo.
+        """
+        self.cancel()
+        with self.lock:
+            generacion = self.generacion
+        Thread(target=self.cargar, args=(list(paths), callback, generacion), daemon=True).start()
+
+    def cargar(self, paths, callback, generacion):
+        """
+        Entrega por lotes las ganancias guardadas y envía las demás canciones a analizar.
+        """
+        con = self.connect()
+        try:
+            for inicio in range(0, len(paths), self.batch_size):
+                if generacion != self.generacion:
+                    return
+                huellas = {}
+                for path in paths[inicio:inicio + self.batch_size]:
+                    h = huella(path)
+                    if h is not None:
+                        huellas.setdefault(h, []).append(path)
+                filas = con.execute(
+                    f"SELECT hash, loudness, peak FROM loudness WHERE hash IN ({','.join('?' * len(huellas))})",
+                    list(huellas),
+                ).fetchall() if huellas else []
+                encontradas = {}
+                for h, sonoridad, pico in filas:
+                    for path in huellas.pop(h):
+                        encontradas[path] = calcular_ganancia(sonoridad, pico)
+                if encontradas:
+                    callback(encontradas)
+                with self.lock:
+                    if generacion != self.generacion:
+                        return
+                    if huellas and self.executor is None:
+                        self.executor = ProcessPoolExecutor(
+                            max_workers=self.workers, mp_context=get_context("spawn"),
+                            initializer=os.nice, initargs=(10,)
+                        )
+                    for h, rutas in huellas.items():
+                        future = self.executor.submit(analizar, rutas[0])
+                        future.add_done_callback(lambda f, h=h, rutas=rutas: self.terminado(h, rutas, f, callback))
+                        self.futures.append(future)
+        except sqlite3.Error as e:
+            print(f"Error al leer la caché de sonoridad: {e}")
+        finally:
+            con.close()
+
+    def terminado(self, h, rutas, future, callback):
+        """
+        Guarda el resultado de un análisis terminado y entrega la ganancia.
+        """
+        if future.cancelled():
+            return
+        if future.exception():
+            print(f"Error al analizar la sonoridad de {rutas[0]}: {future.exception()}")
+            return
+        resultado = future.result()
+        if resultado is None:
+            return
+        sonoridad, pico = resultado
+        con = self.connect()
+        try:
+            con.execute("INSERT OR REPLACE INTO loudness VALUES (?, ?, ?)", (h, sonoridad, pico))
+            con.commit()
+        except sqlite3.Error as e:
+            print(f"Error al guardar la sonoridad: {e}")
+        finally:
+            con.close()
+        ganancia = calcular_ganancia(sonoridad, pico)
+        callback({path: ganancia for path in rutas})
+
+    def cancel(self):
+        """
+        Cancela los análisis pendientes.
+        """
+        with self.lock:
+            self.generacion += 1
+            for future in self.futures:
+                future.cancel()
+            self.futures = []
+
+    def close(self):
+        """
+        Cancela todo el trabajo pendiente y cierra el grupo de procesos.
+        """
+        self.cancel()
+        with self.lock:
+            if self.executor:
+                self.executor.shutdown(wait=False)
+                self.executor = None
+
+
+def generar_pistas(directorio, pistas=8, segundos=30, frecuencia=44100):
+    """
+    Genera canciones WAV estéreo de prueba con tonos de distinto nivel.
+    La primera es una referencia como las de EBU Tech 3341: 997 Hz a -20 dBFS en ambos
+    canales, que debe medir -20 LUFS.
+    """
+    paths = []
+    for k in range(pistas):
+        amplitud = 10 ** ((-20 - 2 * k) / 20) * 32767
+        periodo = array("h")
+        for n in range(frecuencia):
+            muestra = int(amplitud * math.sin(2 * math.pi * 997 * n / frecuencia))
+            periodo.extend((muestra, muestra))
+        path = os.path.join(directorio, f"pista{k + 1}.wav")
+        with wave.open(path, "wb") as f:
+            f.setnchannels(2)
+            f.setsampwidth(2)
+            f.setframerate(frecuencia)
+            for _ in range(segundos):
+                f.writeframes(periodo.tobytes())
+        paths.append(path)
+    return paths
+
+
+# Prueba de rendimiento: analiza canciones generadas con 1 proceso y con todos los
+# núcleos, e informa canciones por minuto por núcleo.
+# Uso: python loudness.py [CANCIONES] [SEGUNDOS]
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    from time import perf_counter
+
+    pistas = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    segundos = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+
+    with tempfile.TemporaryDirectory() as directorio:
+        paths = generar_pistas(directorio, pistas, segundos)
+        resultado = analizar(paths[0])
+        if resultado is None or resultado[0] is None:
+            print("Error al analizar la referencia: no se pudo medir la sonoridad")
+            sys.exit(1)
+        sonoridad, pico = resultado
+        print(f"Referencia (997 Hz, -20 dBFS): {sonoridad:.2f} LUFS, pico {pico:.2f} dBFS, "
+              f"ganancia {calcular_ganancia(sonoridad, pico):+.2f} dB")
+        assert abs(sonoridad + 20) < 0.1, f"la referencia debe medir -20 LUFS, midió {sonoridad:.2f}"
+
+        nucleos = os.cpu_count() or 1
+        for workers in sorted({1, nucleos}):
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+                inicio = perf_counter()
+                list(executor.map(analizar, paths))
+                duracion = perf_counter() - inicio
+            por_minuto = len(paths) / duracion * 60
+            print(f"{workers} proceso(s): {por_minuto:.1f} canciones/min, "
+                  f"{por_minuto / workers:.1f} canciones/min por núcleo "
+                  f"({segundos} s por canción, {'ffmpeg' if shutil.which('ffmpeg') else 'Python'})")
@@ -1,10 +1,11 @@
 import tkinter as tk
 import os
 from screeninfo import get_monitors
-from PIL import Image, ImageTk
+from asset_cache import cargar_imagen
 from usb import USBInterface
 from streaming import StreamingInterface
 from red import RedInterface
+from screen_manager import ScreenManager
 
 
 class CentroMultimedia:
@@ -26,14 +27,14 @@ class CentroMultimedia:
         self.root.resizable(True, True)
 
         self.canvas = None
-        self.mostrar_menu_principal()
+        self.current_frame = None
 
-    def limpiar_ventana(self):
-        """
-        Elimina todos los elementos actuales de la ventana.
-        """
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens = ScreenManager()
+        self.screens.register("menu", self.construir_menu_principal)
+        self.screens.register("usb", self.construir_usb)
+        self.screens.register("streaming", self.construir_streaming)
+        self.screens.register("red", self.construir_red)
+        self.mostrar_menu_principal()
 
     def salir_sistema(self):
         """
@@ -43,20 +44,24 @@ class CentroMultimedia:
 
     def mostrar_menu_principal(self):
         """
-        Configura y muestra el menú principal con opciones de navegación.
+        Muestra el menú principal con opciones de navegación.
         """
-        self.limpiar_ventana()
+        self.screens.show("menu")
 
-        fondo_img = Image.open("img_interfaz/Fondo.jpg").resize(
-            (self.screen_width, self.screen_height), Image.Resampling.LANCZOS
-        )
-        fondo = ImageTk.PhotoImage(fondo_img)
-        self.canvas = tk.Label(self.root, image=fondo)
+    def construir_menu_principal(self):
+        """
+        Construye el menú principal dentro de su propio frame.
+        """
+        self.current_frame = tk.Frame(self.root)
+        self.current_frame.pack(fill="both", expand=True)
+
+        fondo = cargar_imagen("img_interfaz/Fondo.jpg", (self.screen_width, self.screen_height))
+        self.canvas = tk.Label(self.current_frame, image=fondo)
         self.canvas.image = fondo
         self.canvas.place(x=0, y=0, relwidth=1, relheight=1)
 
         barra_sup = tk.Label(
-            self.root,
+            self.current_frame,
             bg="#003264",
             fg="white",
             font=("Arial", 24),
@@ -70,7 +75,7 @@ class CentroMultimedia:
         )
 
         barra_inf = tk.Label(
-            self.root,
+            self.current_frame,
             text="Marco, Monse & Leo",
             bg="#003264",
             fg="white",
@@ -101,7 +106,7 @@ class CentroMultimedia:
             x_pos = start_x + (i % 2) * (button_width + margin_x)
             y_pos = start_y + (i // 2) * (button_height + margin_y)
             btn = tk.Button(
-                self.root,
+                self.current_frame,
                 text=boton["text"],
                 font=("Arial", 14),
                 bg="#00FFFF",
@@ -110,29 +115,49 @@ class CentroMultimedia:
             )
             btn.place(x=x_pos, y=y_pos, width=button_width, height=button_height)
 
+        return self
+
     def mostrar_usb(self):
         """
         Cambia a la interfaz de USB.
         """
-        usb_interface = USBInterface(self.root, self.mostrar_menu_principal)
-        self.limpiar_ventana()
-        usb_interface.mostrar_interfaz_usb()
+        self.screens.show("usb")
 
     def mostrar_streaming(self):
         """
         Cambia a la interfaz de Streaming.
         """
-        streaming_interface = StreamingInterface(self.root, self.mostrar_menu_principal)
-        self.limpiar_ventana()
-        streaming_interface.mostrar_interfaz_streaming()
+        self.screens.show("streaming")
 
     def mostrar_red(self):
         """
         Cambia a la interfaz de Red.
         """
+        self.screens.show("red")
+
+    def construir_usb(self):
+        """
+        Construye la interfaz de USB la primera vez que se muestra.
+        """
+        usb_interface = USBInterface(self.root, self.mostrar_menu_principal)
+        usb_interface.mostrar_interfaz_usb()
+        return usb_interface
+
+    def construir_streaming(self):
+        """
+        Construye la interfaz de Streaming la primera vez que se muestra.
+        """
+        streaming_interface = StreamingInterface(self.root, self.mostrar_menu_principal)
+        streaming_interface.mostrar_interfaz_streaming()
+        return streaming_interface
+
+    def construir_red(self):
+        """
+        Construye la interfaz de Red la primera vez que se muestra.
+        """
         red_interface = RedInterface(self.root, self.mostrar_menu_principal)
-        self.limpiar_ventana()
         red_interface.mostrar_interfaz_red()
+        return red_interface
 
 
 if __name__ == "__main__":
@@ -0,0 +1,180 @@
+import os
+import sqlite3
+from collections import defaultdict
+
+
+def default_index_path():
+    """
+    Devuelve la ruta de la base de datos del índice en el directorio de caché del usuario.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "centro_multimedia", "media_index.sqlite")
+
+
+class MediaIndex:
+    """
+    Índice persistente de archivos multimedia por dispositivo, guardado en SQLite.
+    Cada dispositivo se identifica por el UUID de su sistema de archivos y solo se
+    vuelven a listar los directorios cuya fecha de modificación cambió.
+    """
+    def __init__(self, db_path=None, batch_size=256):
+        """
+        Inicializa el índice y crea las tablas si no existen.
+        """
+        self.db_path = db_path or default_index_path()
+        self.batch_size = batch_size
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        con = self.connect()
+        try:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "uuid TEXT, path TEXT, dir TEXT, size INTEGER, mtime INTEGER, kind TEXT, "
+                "PRIMARY KEY (uuid, path))"
+            )
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS dirs ("
+                "uuid TEXT, path TEXT, parent TEXT, mtime INTEGER, "
+                "PRIMARY KEY (uuid, path))"
+            )
+            con.commit()
+        finally:
+            con.close()
+
+    def connect(self):
+        """
+        Abre una conexión nueva; cada hilo de escaneo usa la suya.
+        """
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def cached_files(self, fs_uuid, mount_point):
+        """
+        Devuelve el listado guardado (images, audio_files, video_files) con rutas absolutas.
+        """
+        result = {"image": [], "audio": [], "video": []}
+        con = self.connect()
+        try:
+            for path, kind in con.execute("SELECT path, kind FROM files WHERE uuid = ?", (fs_uuid,)):
+                result[kind].append(os.path.join(mount_point, path))
+        finally:
+            con.close()
+        return result["image"], result["audio"], result["video"]
+
+    def update(self, fs_uuid, mount_point, media_manager, cancel=None):
+        """
+        Recorre el dispositivo comparándolo con el índice y genera las diferencias como
+        eventos ("append" | "discard", images, audio_files, video_files).
+        Los directorios con la misma fecha de modificación reutilizan su contenido guardado.
+        Las diferencias se envían en cuanto aparece un tipo de archivo que no había.
+        """
+        con = self.connect()
+        try:
+            cached_dirs = {}
+            children = defaultdict(list)
+            for path, parent, mtime in con.execute("SELECT path, parent, mtime FROM dirs WHERE uuid = ?", (fs_uuid,)):
+                cached_dirs[path] = mtime
+                if parent is not None:
+                    children[parent].append(path)
+
+            cached = defaultdict(dict)
+            seen = set()
+            for path, directory, kind in con.execute("SELECT path, dir, kind FROM files WHERE uuid = ?", (fs_uuid,)):
+                cached[directory][path] = kind
+                seen.add(kind)
+
+            added = []
+            removed = []
+            visited = set()
+            pending = [""]
+
+            while pending:
+                if cancel and cancel.is_set():
+                    con.commit()
+                    return
+                rel_dir = pending.pop()
+                visited.add(rel_dir)
+                abs_dir = os.path.join(mount_point, rel_dir)
+                try:
+                    mtime = os.stat(abs_dir).st_mtime_ns
+                except OSError:
+                    continue
+
+                if cached_dirs.get(rel_dir) == mtime:
+                    pending.extend(children[rel_dir])
+                    continue
+
+                files, subdirs = self.list_directory(mount_point, rel_dir, media_manager)
+                old = cached[rel_dir]
+                for path in old.keys() - files.keys():
+                    removed.append((path, old[path]))
+                    con.execute("DELETE FROM files WHERE uuid = ? AND path = ?", (fs_uuid, path))
+                new_kind = False
+                for path, (kind, size, file_mtime) in files.items():
+                    if path not in old:
+                        added.append((path, kind))
+                        if kind not in seen:
+                            seen.add(kind)
+                            new_kind = True
+                    con.execute(
+                        "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                        (fs_uuid, path, rel_dir, size, file_mtime, kind),
+                    )
+                con.execute(
+                    "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?)",
+                    (fs_uuid, rel_dir, os.path.dirname(rel_dir) if rel_dir else None, mtime),
+                )
+                pending.extend(subdirs)
+
+                if new_kind or len(added) + len(removed) >= self.batch_size:
+                    con.commit()
+                    yield from self.diff_events(mount_point, added, removed)
+                    added, removed = [], []
+
+            for rel_dir in cached_dirs.keys() - visited:
+                for path, kind in cached[rel_dir].items():
+                    removed.append((path, kind))
+                con.execute("DELETE FROM files WHERE uuid = ? AND dir = ?", (fs_uuid, rel_dir))
+                con.execute("DELETE FROM dirs WHERE uuid = ? AND path = ?", (fs_uuid, rel_dir))
+
+            con.commit()
+            yield from self.diff_events(mount_point, added, removed)
+        finally:
+            con.close()
+
+    def list_directory(self, mount_point, rel_dir, media_manager):
+        """
+        Lista un directorio y devuelve sus archivos multimedia {ruta: (tipo, tamaño, mtime)}
+        y sus subdirectorios, con rutas relativas al punto de montaje.
+        """
+        files = {}
+        subdirs = []
+        try:
+            with os.scandir(os.path.join(mount_point, rel_dir)) as entries:
+                for entry in entries:
+                    rel_path = os.path.join(rel_dir, entry.name)
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not entry.name.startswith("."):
+                                subdirs.append(rel_path)
+                            continue
+                        kind = media_manager.classify_file(entry.name)
+                        if kind is None or not entry.is_file():
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    files[rel_path] = (kind, st.st_size, st.st_mtime_ns)
+        except OSError:
+            pass
+        return files, subdirs
+
+    def diff_events(self, mount_point, added, removed):
+        """
+        Convierte listas de cambios en eventos con rutas absolutas agrupadas por tipo.
+        """
+        for action, changes in (("discard", removed), ("append", added)):
+            if not changes:
+                continue
+            result = {"image": [], "audio": [], "video": []}
+            for path, kind in changes:
+                result[kind].append(os.path.join(mount_point, path))
+            yield action, result["image"], result["audio"], result["video"]
@@ -0,0 +1,89 @@
+import heapq
+
+
+KINDS = ("image", "audio", "video")
+
+
+def sort_key(path):
+    """
+    Clave de ordenamiento de las vistas: ruta sin distinguir mayúsculas.
+    """
+    return path.lower()
+
+
+class MediaLibrary:
+    """
+    Biblioteca multimedia que combina los archivos de todas las particiones montadas.
+    Guarda los archivos por dispositivo y mantiene vistas combinadas y ordenadas que se
+    actualizan por mezcla incremental en lugar de reordenarse en cada cambio.
+    Las vistas son listas nuevas tras cada cambio, así que pueden compartirse sin copiarlas.
+    """
+    def __init__(self):
+        """
+        Inicializa la biblioteca vacía.
+        """
+        self.devices = {}
+        self.views = {kind: [] for kind in KINDS}
+
+    def apply(self, action, device, images, audio_files, video_files):
+        """
+        Aplica un evento del monitor: "add" reemplaza los archivos del dispositivo,
+        "append" los amplía, "discard" quita rutas y "remove" elimina el dispositivo.
+        Un "append" de un dispositivo sin "add" vigente (de un escaneo que terminó
+        después de que se desconectó) se ignora, igual que un "discard".
+        """
+        batch = dict(zip(KINDS, (images, audio_files, video_files)))
+        if action == "add":
+            self.remove(device)
+            self.append(device, batch)
+        elif action == "append":
+            if device in self.devices:
+                self.append(device, batch)
+        elif action == "discard":
+            self.discard(device, batch)
+        elif action == "remove":
+            self.remove(device)
+
+    def append(self, device, batch):
+        """
+        Añade archivos de un dispositivo mezclándolos con las vistas ordenadas.
+        """
+        files = self.devices.setdefault(device, {kind: set() for kind in KINDS})
+        for kind in KINDS:
+            nuevos = [path for path in set(batch[kind]) if path not in files[kind]]
+            if not nuevos:
+                continue
+            files[kind].update(nuevos)
+            nuevos.sort(key=sort_key)
+            self.views[kind] = list(heapq.merge(self.views[kind], nuevos, key=sort_key))
+
+    def discard(self, device, batch):
+        """
+        Quita rutas concretas de un dispositivo.
+        """
+        files = self.devices.get(device)
+        if not files:
+            return
+        for kind in KINDS:
+            removed = files[kind].intersection(batch[kind])
+            if removed:
+                files[kind] -= removed
+                self.views[kind] = [path for path in self.views[kind] if path not in removed]
+
+    def remove(self, device):
+        """
+        Elimina solo los archivos del dispositivo que se desconectó.
+        """
+        files = self.devices.pop(device, None)
+        if not files:
+            return
+        for kind in KINDS:
+            if files[kind]:
+                self.views[kind] = [path for path in self.views[kind] if path not in files[kind]]
+
+    def snapshot(self):
+        """
+        Devuelve las vistas combinadas (images, audio_files, video_files).
+        No deben modificarse: se reemplazan por listas nuevas en cada cambio.
+        """
+        return self.views["image"], self.views["audio"], self.views["video"]
@@ -1,43 +1,124 @@
 import os
 import pyudev
-from time import sleep
-import subprocess as sp
+from threading import Thread, Event
+from media_index import MediaIndex
+from mount_manager import MountManager
 
 class MediaManager:
     """
     Clase para gestionar archivos multimedia y monitorear dispositivos USB.
     Soporta clasificación de archivos y montado automático.
     """
-    def __init__(self):
+    def __init__(self, image_formats=None, audio_formats=None, video_formats=None):
         """
         Inicializa los formatos de archivo compatibles para imágenes, audio y video.
+        Cada lista puede reemplazarse para configurar los formatos reconocidos; una lista
+        vacía desactiva ese tipo de archivo.
         """
-        self.image_formats = [".jpeg", ".jpg", ".png", ".bmp", ".tiff", ".tif",
-                              ".webp", ".tga", ".pam", ".ppm", ".pgm", ".pbm", ".xcf", ".svg"]
+        if image_formats is None:
+            image_formats = [".jpeg", ".jpg", ".png", ".bmp", ".tiff", ".tif",
+                             ".webp", ".tga", ".pam", ".ppm", ".pgm", ".pbm", ".xcf", ".svg"]
+        self.image_formats = image_formats
 
-        self.audio_formats = [".mp3", ".aac", ".wav", ".flac", ".ogg", ".wma",
-                              ".m4a", ".opus", ".aiff", ".amr"]
+        if audio_formats is None:
+            audio_formats = [".mp3", ".aac", ".wav", ".flac", ".ogg", ".wma",
+                             ".m4a", ".opus", ".aiff", ".amr"]
+        self.audio_formats = audio_formats
 
-        self.video_formats = [".mp4", ".avi", ".mkv", ".mov", ".flv", ".webm",
-                              ".wmv", ".mpg", ".mpeg", ".m4v", ".3gp", ".ogv",
-                              ".divx", ".xvid"]
+        if video_formats is None:
+            video_formats = [".mp4", ".avi", ".mkv", ".mov", ".flv", ".webm",
+                             ".wmv", ".mpg", ".mpeg", ".m4v", ".3gp", ".ogv",
+                             ".divx", ".xvid"]
+        self.video_formats = video_formats
+
+        self.format_table = self.build_format_table()
+
+        self.scan_batch_size = 256
+        self.scans = {}
+        self.media_index = None
+        self.mount_manager = MountManager()
+
+    def build_format_table(self):
+        """
+        Construye la tabla extensión -> tipo usada para clasificar archivos.
+        Debe volver a llamarse si se modifican las listas de formatos.
+        """
+        table = {}
+        for kind, formats in (("video", self.video_formats),
+                              ("audio", self.audio_formats),
+                              ("image", self.image_formats)):
+            for ext in formats:
+                table[ext.lower()] = kind
+        return table
+
+    def classify_file(self, name):
+        """
+        Devuelve el tipo de un archivo ("image", "audio" o "video") o None si no es compatible.
+        La extensión se compara sin distinguir mayúsculas de minúsculas.
+        """
+        return self.format_table.get(os.path.splitext(name)[1].lower())
+
+    def scan_media_files(self, path, cancel=None):
+        """
+        Recorre recursivamente un directorio con os.scandir y genera lotes
+        (images, audio_files, video_files) a medida que encuentra archivos.
+        El primer archivo de cada tipo se entrega de inmediato en su propio lote.
+        Se detiene en cuanto `cancel` (threading.Event) queda activado.
+        """
+        batch = {"image": [], "audio": [], "video": []}
+        count = 0
+        seen = set()
+        pending = [path]
+
+        while pending:
+            if cancel and cancel.is_set():
+                return
+            try:
+                entries = os.scandir(pending.pop())
+            except OSError:
+                continue
+
+            with entries:
+                for entry in entries:
+                    if cancel and cancel.is_set():
+                        return
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not entry.name.startswith("."):
+                                pending.append(entry.path)
+                            continue
+                        if not entry.is_file():
+                            continue
+                    except OSError:
+                        continue
+
+                    kind = self.classify_file(entry.name)
+                    if kind is None:
+                        continue
+                    batch[kind].append(entry.path)
+                    count += 1
+
+                    if count >= self.scan_batch_size or kind not in seen:
+                        seen.add(kind)
+                        yield batch["image"], batch["audio"], batch["video"]
+                        batch = {"image": [], "audio": [], "video": []}
+                        count = 0
+
+        if count:
+            yield batch["image"], batch["audio"], batch["video"]
 
     def get_media_files(self, path):
         """
-        Clasifica archivos en imágenes, audio y video dentro de un directorio dado.
+        Clasifica archivos en imágenes, audio y video dentro de un directorio dado y sus subdirectorios.
         """
         images = []
         audio_files = []
         video_files = []
 
-        for file in os.listdir(path):
-            file_path = os.path.join(path, file)
-            if any(file.endswith(ext) for ext in self.image_formats):
-                images.append(file_path)
-            elif any(file.endswith(ext) for ext in self.audio_formats):
-                audio_files.append(file_path)
-            elif any(file.endswith(ext) for ext in self.video_formats):
-                video_files.append(file_path)
+        for batch_images, batch_audio, batch_video in self.scan_media_files(path):
+            images.extend(batch_images)
+            audio_files.extend(batch_audio)
+            video_files.extend(batch_video)
 
         return images, audio_files, video_files
 
@@ -45,21 +126,18 @@ class MediaManager:
         """
         Monta automáticamente un dispositivo en el sistema.
         """
-        args = ["udisksctl", "mount", "-b", path]
-        sp.run(args)
+        return self.mount_manager.mount(path)
 
     def get_mount_point(self, path):
         """
         Obtiene el punto de montaje de un dispositivo dado.
         """
-        args = ["findmnt", "-unl", "-S", path]
-        cp = sp.run(args, capture_output=True, text=True)
-        out = cp.stdout.split(" ")[0]
-        return out
+        return self.mount_manager.find_mount_point(path)
 
     def monitor_devices(self, queue):
         """
         Monitorea dispositivos USB conectados y desconectados, enviando actualizaciones a una cola.
+        Bloquea en el socket de udev hasta que llega un evento, sin esperas fijas.
         """
         context = pyudev.Context()
         monitor = pyudev.Monitor.from_netlink(context)
@@ -67,16 +145,102 @@ class MediaManager:
 
         for device in iter(monitor.poll, None):
             if device.action == "add":
+                self.cancel_scan(device.sys_name)
+                cancel = Event()
+                self.scans[device.sys_name] = cancel
+                fs_uuid = device.properties.get("ID_FS_UUID")
+                Thread(target=self.scan_device, args=(device.sys_name, queue, cancel, fs_uuid), daemon=True).start()
+
+            elif device.action == "remove":
+                self.cancel_scan(device.sys_name)
+                queue.put(("remove", device.sys_name, [], [], []))
+
+    def cancel_scan(self, sys_name):
+        """
+        Cancela el escaneo en curso de un dispositivo, si existe.
+        """
+        cancel = self.scans.pop(sys_name, None)
+        if cancel:
+            cancel.set()
+
+    def get_media_index(self):
+        """
+        Devuelve el índice persistente de dispositivos, creándolo la primera vez.
+        """
+        if self.media_index is None:
+            self.media_index = MediaIndex(batch_size=self.scan_batch_size)
+        return self.media_index
+
+    def scan_device(self, sys_name, queue, cancel, fs_uuid=None):
+        """
+        Monta un dispositivo y envía sus archivos multimedia a la cola por lotes, como
+        eventos (action, sys_name, images, audio_files, video_files).
+        El primer lote llega como "add" y reemplaza la lista anterior; los siguientes
+        llegan como "append" (se añaden) o "discard" (se eliminan).
+        Si el dispositivo tiene UUID, se envía primero el listado guardado en el índice
+        y después solo las diferencias encontradas.
+        """
+        try:
+            result = self.auto_mount("/dev/" + sys_name)
+            if result.error:
+                print(f"Error al montar {result.device}: {result.error}")
+                return
+            mount_point = result.mount_point
+
+            if fs_uuid:
                 try:
-                    self.auto_mount("/dev/" + device.sys_name)
-                    mount_point = self.get_mount_point("/dev/" + device.sys_name)
-                    if mount_point:
-                        images, audio_files, video_files = self.get_media_files(mount_point)
-                        queue.put(("add", images, audio_files, video_files))
+                    index = self.get_media_index()
+                    cached = index.cached_files(fs_uuid, mount_point)
+                    if cancel.is_set():
+                        return
+                    queue.put(("add", sys_name) + cached)
+                    for event in index.update(fs_uuid, mount_point, self, cancel):
+                        if cancel.is_set():
+                            return
+                        queue.put((event[0], sys_name) + event[1:])
+                    return
                 except Exception as e:
-                    print(f"Error al añadir dispositivo: {e}")
+                    print(f"Error en el índice de medios, se realiza un escaneo completo: {e}")
 
-            elif device.action == "remove":
-                queue.put(("remove", [], [], []))
+            action = "add"
+            for images, audio_files, video_files in self.scan_media_files(mount_point, cancel):
+                if cancel.is_set():
+                    return
+                queue.put((action, sys_name, images, audio_files, video_files))
+                action = "append"
+
+            if action == "add" and not cancel.is_set():
+                queue.put(("add", sys_name, [], [], []))
+        except Exception as e:
+            print(f"Error al añadir dispositivo: {e}")
+        finally:
+            if self.scans.get(sys_name) is cancel:
+                del self.scans[sys_name]
+
+
+# Micro-benchmark de clasificación sobre un directorio sintético
+if __name__ == "__main__":
+    import tempfile
+    from time import perf_counter
+
+    extensiones = [".JPG", ".jpg", ".png", ".MP3", ".flac", ".mp4", ".MKV", ".txt", ".pdf", ""]
+    total = 100000
+    manager = MediaManager()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(total):
+            open(os.path.join(tmp, f"archivo_{i}{extensiones[i % len(extensiones)]}"), "w").close()
+
+        nombres = os.listdir(tmp)
+        inicio = perf_counter()
+        for nombre in nombres:
+            manager.classify_file(nombre)
+        clasificacion = perf_counter() - inicio
+
+        inicio = perf_counter()
+        images, audio_files, video_files = manager.get_media_files(tmp)
+        escaneo = perf_counter() - inicio
 
-            sleep(1)
+    print(f"Clasificación: {clasificacion * 1e9 / total:.0f} ns por archivo")
+    print(f"Escaneo completo: {escaneo * 1e6 / total:.2f} µs por archivo")
+    print(f"Imágenes: {len(images)}, audio: {len(audio_files)}, video: {len(video_files)}")
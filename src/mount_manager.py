@@ -0,0 +1,151 @@
+import os
+import re
+import subprocess as sp
+from collections import namedtuple
+from threading import Lock
+
+
+MountResult = namedtuple("MountResult", ["device", "mount_point", "error"])
+
+
+def decode_mountinfo_field(field):
+    """
+    Decodifica los escapes octales de mountinfo (por ejemplo \\040 para un espacio).
+    """
+    return re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), field)
+
+
+def parse_mountinfo(path="/proc/self/mountinfo"):
+    """
+    Lee un archivo mountinfo y devuelve una lista de (origen, major:minor, punto de montaje).
+    """
+    mounts = []
+    with open(path, encoding="utf-8", errors="surrogateescape") as f:
+        for line in f:
+            fields = line.split()
+            if "-" not in fields:
+                continue
+            sep = fields.index("-")
+            if sep < 6 or len(fields) < sep + 3:
+                continue
+            mounts.append((
+                decode_mountinfo_field(fields[sep + 2]),
+                fields[2],
+                decode_mountinfo_field(fields[4]),
+            ))
+    return mounts
+
+
+class MountManager:
+    """
+    Clase para montar particiones y localizar sus puntos de montaje.
+    Lee los puntos de montaje de /proc/self/mountinfo en lugar de ejecutar findmnt,
+    y puede montar varias particiones a la vez desde distintos hilos.
+    """
+    def __init__(self, mountinfo_path="/proc/self/mountinfo", mount_command=None, listener=None):
+        """
+        Inicializa la ruta de mountinfo, el comando de montaje y un oyente opcional
+        que recibe cada MountResult.
+        """
+        self.mountinfo_path = mountinfo_path
+        self.mount_command = mount_command or ["udisksctl", "mount", "-b"]
+        self.listener = listener
+        self.lock = Lock()
+        self.in_progress = {}
+
+    def device_number(self, device):
+        """
+        Devuelve el identificador major:minor de un dispositivo de bloque, o None.
+        """
+        try:
+            rdev = os.stat(device).st_rdev
+        except OSError:
+            return None
+        return f"{os.major(rdev)}:{os.minor(rdev)}"
+
+    def find_mount_point(self, device):
+        """
+        Obtiene el punto de montaje de un dispositivo a partir de mountinfo, o None.
+        """
+        number = self.device_number(device)
+        try:
+            mounts = parse_mountinfo(self.mountinfo_path)
+        except OSError as e:
+            print(f"Error al leer {self.mountinfo_path}: {e}")
+            return None
+        for source, dev_number, mount_point in mounts:
+            if source == device or (number and dev_number == number):
+                return mount_point
+        return None
+
+    def mount(self, device):
+        """
+        Monta un dispositivo si aún no lo está y devuelve un MountResult.
+        Si otro hilo ya está montando el mismo dispositivo, espera a que termine.
+        """
+        with self.lock:
+            device_lock = self.in_progress.setdefault(device, Lock())
+
+        with device_lock:
+            mount_point = self.find_mount_point(device)
+            error = None
+            if not mount_point:
+                try:
+                    cp = sp.run(self.mount_command + [device], capture_output=True, text=True)
+                    if cp.returncode != 0:
+                        error = cp.stderr.strip() or f"código de salida {cp.returncode}"
+                except OSError as e:
+                    error = str(e)
+                mount_point = self.find_mount_point(device)
+                if mount_point:
+                    error = None
+                elif error is None:
+                    error = "no se encontró el punto de montaje"
+
+        with self.lock:
+            if self.in_progress.get(device) is device_lock and not device_lock.locked():
+                del self.in_progress[device]
+
+        result = MountResult(device, mount_point, error)
+        if self.listener:
+            self.listener(result)
+        return result
+
+
+# Autocomprobación con un mountinfo falso (rutas con espacios escapados como \040) y un
+# comando de montaje simulado que agrega la partición al archivo.
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mountinfo = os.path.join(tmp, "mountinfo")
+        with open(mountinfo, "w", encoding="utf-8") as f:
+            f.write("22 1 8:2 / / rw,relatime shared:1 - ext4 /dev/sda2 rw\n")
+            f.write("35 22 8:17 / /media/pi/MI\\040USB rw,nosuid shared:20 - vfat /dev/sdb1 rw\n")
+            f.write("36 22 8:18 / /media/pi/Fotos\\0112024 rw shared:21 - exfat /dev/sdb2 rw\n")
+
+        assert parse_mountinfo(mountinfo) == [
+            ("/dev/sda2", "8:2", "/"),
+            ("/dev/sdb1", "8:17", "/media/pi/MI USB"),
+            ("/dev/sdb2", "8:18", "/media/pi/Fotos\t2024"),
+        ]
+
+        montar = [sys.executable, "-c",
+                  "import sys; open(sys.argv[1], 'a').write("
+                  "'37 22 8:33 / /media/pi/OTRO\\\\040USB rw shared:22 - vfat ' + sys.argv[2] + ' rw\\n')",
+                  mountinfo]
+        resultados = []
+        manager = MountManager(mountinfo, montar, listener=resultados.append)
+
+        # Ya montado: no ejecuta el comando (el archivo no cambia).
+        assert manager.mount("/dev/sdb1") == MountResult("/dev/sdb1", "/media/pi/MI USB", None)
+        assert len(parse_mountinfo(mountinfo)) == 3
+        # Sin montar: el comando agrega la partición y se encuentra su punto de montaje.
+        assert manager.mount("/dev/sdc1") == MountResult("/dev/sdc1", "/media/pi/OTRO USB", None)
+        # El comando falla y la partición no aparece.
+        fallido = MountManager(mountinfo, [sys.executable, "-c", "import sys; sys.exit(3)"]).mount("/dev/sdd1")
+        assert fallido.mount_point is None and fallido.error == "código de salida 3", fallido
+        assert len(resultados) == 2 and not manager.in_progress
+
+    print("mount_manager: autocomprobación correcta")
@@ -0,0 +1,395 @@
+import os
+import sqlite3
+import hashlib
+from bisect import bisect_left, insort
+from collections import namedtuple, defaultdict, Counter
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread, Lock, get_ident
+from time import sleep
+from urllib.parse import urlparse, unquote
+import vlc
+from PIL import Image
+from vlc_player import get_player_service
+
+
+Pista = namedtuple("Pista", ["path", "title", "artist", "album", "number", "duration", "cover"])
+
+ARTISTA_DESCONOCIDO = "Artista desconocido"
+ALBUM_DESCONOCIDO = "Álbum desconocido"
+
+
+def default_cache_dir():
+    """
+    Devuelve el directorio de caché de la biblioteca musical.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "centro_multimedia", "musica")
+
+
+def pista_basica(path):
+    """
+    Devuelve la pista de un archivo aún sin analizar, titulada con el nombre del archivo.
+    """
+    return Pista(path, os.path.splitext(os.path.basename(path))[0], None, None, 0, None, None)
+
+
+def clave(texto):
+    """
+    Clave de ordenación sin distinguir mayúsculas ni minúsculas.
+    """
+    return texto.casefold()
+
+
+def numero_de_pista(texto):
+    """
+    Convierte el número de pista de las etiquetas ("3" o "3/12") a entero.
+    """
+    try:
+        return int((texto or "0").split("/")[0])
+    except ValueError:
+        return 0
+
+
+class MusicIndex:
+    """
+    Índice en memoria de la biblioteca musical con vistas por artista, álbum y canción.
+    Cada vista es una lista ordenada que se mantiene al insertar o reemplazar pistas
+    (búsqueda binaria), de modo que nunca se vuelve a ordenar la biblioteca completa.
+    Se usa desde un solo hilo (el de Tk).
+    """
+    def __init__(self, paths=()):
+        """
+        Inicializa el índice con las pistas básicas de `paths`.
+        """
+        self.pistas = {}
+        self.nombres = {}
+        self.titulos = []
+        self.artistas = []
+        self.albumes = []
+        self.conteo_artistas = Counter()
+        self.conteo_albumes = Counter()
+        self.conteo_albumes_artista = Counter()
+        self.albumes_artista = defaultdict(list)
+        self.pistas_artista = defaultdict(list)
+        self.pistas_album = defaultdict(list)
+        self.cargar(pista_basica(path) for path in paths)
+
+    def cargar(self, pistas):
+        """
+        Carga muchas pistas de una vez: agrega todas las entradas y ordena cada vista
+        una sola vez, más rápido que insertarlas de una en una. Las rutas que ya están
+        en el índice se conservan.
+        """
+        for pista in pistas:
+            if pista.path in self.pistas:
+                continue
+            self.pistas[pista.path] = pista
+            titulo, artista, album = self.claves(pista)
+            self.titulos.append((titulo, pista.path))
+            self.pistas_artista[artista].append((album, pista.number, titulo, pista.path))
+            self.pistas_album[album].append((pista.number, titulo, pista.path))
+            self.conteo_artistas[artista] += 1
+            self.conteo_albumes[album] += 1
+            self.conteo_albumes_artista[(artista, album)] += 1
+        self.titulos.sort()
+        for lista in (*self.pistas_artista.values(), *self.pistas_album.values()):
+            lista.sort()
+        self.artistas = sorted(artista for artista, n in self.conteo_artistas.items() if n)
+        self.albumes = sorted(album for album, n in self.conteo_albumes.items() if n)
+        self.albumes_artista.clear()
+        for (artista, album), n in sorted(self.conteo_albumes_artista.items()):
+            if n:
+                self.albumes_artista[artista].append(album)
+
+    def claves(self, pista):
+        """
+        Devuelve las claves de ordenación (título, artista, álbum) de una pista y
+        guarda el nombre visible de cada una.
+        """
+        artista = pista.artist or ARTISTA_DESCONOCIDO
+        album = pista.album or ALBUM_DESCONOCIDO
+        claves = (clave(pista.title), clave(artista), clave(album))
+        self.nombres.setdefault(("artista", claves[1]), artista)
+        self.nombres.setdefault(("album", claves[2]), album)
+        return claves
+
+    def actualizar(self, pista):
+        """
+        Inserta o reemplaza una pista. Devuelve True si el índice cambió.
+        """
+        anterior = self.pistas.get(pista.path)
+        if anterior == pista:
+            return False
+        if anterior is not None:
+            self.quitar(anterior)
+        self.pistas[pista.path] = pista
+
+        titulo, artista, album = self.claves(pista)
+        insort(self.titulos, (titulo, pista.path))
+        insort(self.pistas_artista[artista], (album, pista.number, titulo, pista.path))
+        insort(self.pistas_album[album], (pista.number, titulo, pista.path))
+        if self.conteo_artistas[artista] == 0:
+            insort(self.artistas, artista)
+        if self.conteo_albumes[album] == 0:
+            insort(self.albumes, album)
+        if self.conteo_albumes_artista[(artista, album)] == 0:
+            insort(self.albumes_artista[artista], album)
+        self.conteo_artistas[artista] += 1
+        self.conteo_albumes[album] += 1
+        self.conteo_albumes_artista[(artista, album)] += 1
+        return True
+
+    def quitar(self, pista):
+        """
+        Elimina una pista de todas las vistas.
+        """
+        titulo, artista, album = self.claves(pista)
+        self.quitar_de(self.titulos, (titulo, pista.path))
+        self.quitar_de(self.pistas_artista[artista], (album, pista.number, titulo, pista.path))
+        self.quitar_de(self.pistas_album[album], (pista.number, titulo, pista.path))
+        self.conteo_artistas[artista] -= 1
+        self.conteo_albumes[album] -= 1
+        self.conteo_albumes_artista[(artista, album)] -= 1
+        if self.conteo_artistas[artista] == 0:
+            self.quitar_de(self.artistas, artista)
+        if self.conteo_albumes[album] == 0:
+            self.quitar_de(self.albumes, album)
+        if self.conteo_albumes_artista[(artista, album)] == 0:
+            self.quitar_de(self.albumes_artista[artista], album)
+
+    def quitar_de(self, lista, elemento):
+        """
+        Elimina un elemento de una lista ordenada con búsqueda binaria.
+        """
+        i = bisect_left(lista, elemento)
+        if i < len(lista) and lista[i] == elemento:
+            del lista[i]
+
+    def nombre_artista(self, artista):
+        """
+        Devuelve el nombre visible de una clave de artista.
+        """
+        return self.nombres.get(("artista", artista), artista)
+
+    def nombre_album(self, album):
+        """
+        Devuelve el nombre visible de una clave de álbum.
+        """
+        return self.nombres.get(("album", album), album)
+
+    def vista_artistas(self):
+        """
+        Claves de los artistas en orden alfabético.
+        """
+        return self.artistas
+
+    def vista_albumes(self, artista=None):
+        """
+        Claves de los álbumes en orden alfabético, de todos o de un artista.
+        """
+        return self.albumes_artista[artista] if artista is not None else self.albumes
+
+    def vista_pistas(self, artista=None, album=None):
+        """
+        Rutas de las pistas: por título, por álbum y número de pista de un artista,
+        o por número de pista de un álbum.
+        """
+        if album is not None:
+            entradas = self.pistas_album[album]
+            if artista is not None:
+                return [e[-1] for e in entradas if clave(self.pistas[e[-1]].artist or ARTISTA_DESCONOCIDO) == artista]
+            return [e[-1] for e in entradas]
+        if artista is not None:
+            return [e[-1] for e in self.pistas_artista[artista]]
+        return [e[-1] for e in self.titulos]
+
+
+class MetadataService:
+    """
+    Servicio para leer las etiquetas (ID3, Vorbis, MP4) y la carátula incrustada de las
+    canciones en segundo plano con libvlc. Los resultados se guardan en SQLite según la
+    identidad del archivo (ruta, tamaño y fecha de modificación): las pistas ya
+    analizadas se entregan por lotes desde la caché y el resto se analiza en un grupo de hilos.
+    """
+    def __init__(self, cache_dir=None, workers=2, cover_size=300, timeout=10, batch_size=500):
+        """
+        Inicializa el grupo de hilos y crea la tabla si no existe.
+        """
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.db_path = os.path.join(self.cache_dir, "metadatos.sqlite")
+        self.cover_size = cover_size
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.lock = Lock()
+        self.futures = []
+        self.generacion = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        con = self.connect()
+        try:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS tracks ("
+                "key TEXT PRIMARY KEY, title TEXT, artist TEXT, album TEXT, "
+                "number INTEGER, duration INTEGER, cover TEXT)"
+            )
+            con.commit()
+        finally:
+            con.close()
+
+    def connect(self):
+        """
+        Abre una conexión nueva; cada hilo usa la suya.
+        """
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def cache_key(self, path):
+        """
+        Devuelve la clave de caché del archivo, o None si ya no existe.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def start(self, paths, callback):
+        """
+        Cancela el trabajo anterior y empieza a obtener los metadatos de `paths`.
+        `callback(pistas)` se llama desde hilos de trabajo con listas de Pista.
+        """
+        self.cancel()
+        with self.lock:
+            generacion = self.generacion
+        Thread(target=self.cargar, args=(list(paths), callback, generacion), daemon=True).start()
+
+    def cargar(self, paths, callback, generacion):
+        """
+        Entrega por lotes las pistas guardadas y envía las demás al grupo de hilos.
+        """
+        con = self.connect()
+        try:
+            for inicio in range(0, len(paths), self.batch_size):
+                if generacion != self.generacion:
+                    return
+                claves = {}
+                for path in paths[inicio:inicio + self.batch_size]:
+                    key = self.cache_key(path)
+                    if key is not None:
+                        claves[key] = path
+                filas = con.execute(
+                    "SELECT key, title, artist, album, number, duration, cover FROM tracks "
+                    f"WHERE key IN ({','.join('?' * len(claves))})",
+                    list(claves),
+                ).fetchall() if claves else []
+                encontradas = [Pista(claves.pop(fila[0]), *fila[1:]) for fila in filas]
+                if encontradas:
+                    callback(encontradas)
+                with self.lock:
+                    if generacion != self.generacion:
+                        return
+                    for key, path in claves.items():
+                        future = self.executor.submit(self.extraer, path, key)
+                        future.add_done_callback(lambda f, p=path: self.terminado(p, f, callback))
+                        self.futures.append(future)
+        except sqlite3.Error as e:
+            print(f"Error al leer la caché de metadatos: {e}")
+        finally:
+            con.close()
+
+    def terminado(self, path, future, callback):
+        """
+        Entrega el resultado de un análisis terminado.
+        """
+        if future.cancelled():
+            return
+        if future.exception():
+            print(f"Error al leer las etiquetas de {path}: {future.exception()}")
+            return
+        callback([future.result()])
+
+    def cancel(self):
+        """
+        Cancela las solicitudes pendientes.
+        """
+        with self.lock:
+            self.generacion += 1
+            for future in self.futures:
+                future.cancel()
+            self.futures = []
+
+    def close(self):
+        """
+        Cancela todo el trabajo pendiente y libera el grupo de hilos.
+        """
+        self.cancel()
+        self.executor.shutdown(wait=False)
+
+    def extraer(self, path, key):
+        """
+        Lee las etiquetas y la carátula de una canción con libvlc y guarda el resultado.
+        Se ejecuta en un hilo de trabajo.
+        """
+        media = get_player_service().instance.media_new(path)
+        try:
+            media.parse_with_options(vlc.MediaParseFlag.local | vlc.MediaParseFlag.fetch_local,
+                                     self.timeout * 1000)
+            for _ in range(self.timeout * 20):
+                if media.get_parsed_status() != 0:
+                    break
+                sleep(0.05)
+            titulo = media.get_meta(vlc.Meta.Title)
+            # Sin etiqueta de título, libvlc devuelve el nombre del archivo.
+            if not titulo or titulo == os.path.basename(path):
+                titulo = pista_basica(path).title
+            duracion = media.get_duration()
+            caratula = self.guardar_caratula(media.get_meta(vlc.Meta.ArtworkURL))
+            pista = Pista(
+                path,
+                titulo,
+                media.get_meta(vlc.Meta.Artist) or None,
+                media.get_meta(vlc.Meta.Album) or None,
+                numero_de_pista(media.get_meta(vlc.Meta.TrackNumber)),
+                duracion if duracion > 0 else None,
+                caratula or None,
+            )
+        finally:
+            media.release()
+
+        # Si la carátula no se pudo guardar, la pista no se guarda para reintentarlo después.
+        if caratula is False:
+            return pista
+        con = self.connect()
+        try:
+            con.execute("INSERT OR REPLACE INTO tracks VALUES (?, ?, ?, ?, ?, ?, ?)", (key, *pista[1:]))
+            con.commit()
+        finally:
+            con.close()
+        return pista
+
+    def guardar_caratula(self, url):
+        """
+        Reduce la carátula que libvlc extrajo del archivo y la guarda en la caché.
+        libvlc guarda una carátula por álbum, así que la copia reducida se identifica por
+        su URL y la comparten todas las pistas del álbum.
+        Devuelve su ruta, None si la canción no tiene carátula o False si no se pudo guardar.
+        """
+        if not url or not url.startswith("file://"):
+            return None
+        cover_path = os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".jpg")
+        if os.path.exists(cover_path):
+            return cover_path
+        # Los trabajadores son hilos del mismo proceso: el nombre temporal lleva el del hilo.
+        tmp_path = f"{cover_path}.{os.getpid()}.{get_ident()}.tmp"
+        try:
+            with Image.open(unquote(urlparse(url).path)) as img:
+                img.draft("RGB", (self.cover_size, self.cover_size))
+                img.thumbnail((self.cover_size, self.cover_size))
+                img.convert("RGB").save(tmp_path, format="JPEG", quality=85)
+            os.replace(tmp_path, cover_path)
+        except OSError as e:
+            print(f"Error al guardar la carátula: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        return cover_path
@@ -0,0 +1,239 @@
+import random
+import unicodedata
+from threading import Lock
+
+
+def normalizar(texto):
+    """
+    Convierte un texto a minúsculas y sin acentos para buscarlo.
+    """
+    if texto.isascii():
+        return texto.lower()
+    texto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+class Playlist:
+    """
+    Lista de reproducción con orden secuencial o aleatorio y una cola de "reproducir a
+    continuación". En modo aleatorio cada canción suena una vez por vuelta y una vuelta
+    nueva no empieza con la canción que terminó la anterior.
+    `proximo` y `comenzo` los llama el motor de audio desde su hilo; el resto, el hilo de Tk.
+    """
+    def __init__(self, paths, aleatorio=False, repetir=True, inicio=0):
+        """
+        Crea la lista con la canción `inicio` como actual.
+        """
+        self.paths = paths
+        self.aleatorio = aleatorio
+        self.repetir = repetir
+        self.lock = Lock()
+        self.cola = []
+        self.historial = []
+        self.siguiente_vuelta = None
+        self.ordenar(inicio)
+
+    def ordenar(self, actual):
+        """
+        Rehace el orden a partir de la canción `actual`: secuencial, o aleatorio con
+        `actual` primero y el resto barajado.
+        """
+        n = len(self.paths)
+        if self.aleatorio and n:
+            resto = [i for i in range(n) if i != actual]
+            random.shuffle(resto)
+            self.orden = [actual] + resto
+        else:
+            self.orden = list(range(n))
+        self.posiciones = {index: pos for pos, index in enumerate(self.orden)}
+        self.pos = self.posiciones.get(actual, 0)
+        self.siguiente_vuelta = None
+
+    def nueva_vuelta(self):
+        """
+        Devuelve el orden de la vuelta siguiente (lo genera una sola vez).
+        """
+        if self.siguiente_vuelta is None:
+            if not self.aleatorio:
+                self.siguiente_vuelta = list(range(len(self.paths)))
+            else:
+                orden = list(range(len(self.paths)))
+                random.shuffle(orden)
+                if len(orden) > 1 and orden[0] == self.orden[-1]:
+                    orden[0], orden[-1] = orden[-1], orden[0]
+                self.siguiente_vuelta = orden
+        return self.siguiente_vuelta
+
+    def proximo(self, index):
+        """
+        Devuelve, sin avanzar, la canción que sigue a `index`: la primera de la cola o la
+        siguiente del orden. None si terminó la lista y no se repite.
+        """
+        with self.lock:
+            if self.cola:
+                return self.cola[0]
+            if self.pos + 1 < len(self.orden):
+                return self.orden[self.pos + 1]
+            if self.repetir and self.orden:
+                return self.nueva_vuelta()[0]
+            return None
+
+    def comenzo(self, index):
+        """
+        Registra que empezó a sonar la canción `index` y avanza la posición en consecuencia.
+        """
+        with self.lock:
+            self.historial.append(index)
+            del self.historial[:-100]
+            if self.cola and self.cola[0] == index:
+                self.cola.pop(0)
+                return
+            if self.pos + 1 < len(self.orden) and self.orden[self.pos + 1] == index:
+                self.pos += 1
+                return
+            if self.pos + 1 >= len(self.orden) and self.siguiente_vuelta and self.siguiente_vuelta[0] == index:
+                self.orden = self.siguiente_vuelta
+                self.posiciones = {i: pos for pos, i in enumerate(self.orden)}
+                self.siguiente_vuelta = None
+                self.pos = 0
+                return
+            self.saltar(index)
+
+    def saltar(self, index):
+        """
+        Mueve la posición a la canción `index` elegida por el usuario. En modo aleatorio,
+        si aún no había sonado en esta vuelta, se trae a la posición siguiente para que
+        las demás pendientes no se pierdan ni se repitan. Debe llamarse con el candado tomado.
+        """
+        pos = self.posiciones.get(index)
+        if pos is None:
+            return
+        if not self.aleatorio:
+            self.pos = pos
+        elif pos > self.pos:
+            destino = self.pos + 1
+            otro = self.orden[destino]
+            self.orden[destino], self.orden[pos] = index, otro
+            self.posiciones[index], self.posiciones[otro] = destino, pos
+            self.pos = destino
+
+    def anterior(self, index):
+        """
+        Devuelve la canción que sonó antes de `index`, o la anterior del orden.
+        """
+        with self.lock:
+            if len(self.historial) >= 2 and self.historial[-1] == index:
+                self.historial.pop()
+                return self.historial.pop()
+            return self.orden[(self.posiciones.get(index, self.pos) - 1) % len(self.orden)]
+
+    def encolar(self, index):
+        """
+        Agrega una canción a la cola de "reproducir a continuación".
+        """
+        with self.lock:
+            self.cola.append(index)
+
+    def en_cola(self, index):
+        """
+        Devuelve la posición (desde 1) de la canción en la cola, o 0 si no está.
+        """
+        with self.lock:
+            return self.cola.index(index) + 1 if index in self.cola else 0
+
+    def cambiar_aleatorio(self, aleatorio, actual):
+        """
+        Activa o desactiva el modo aleatorio conservando la canción actual.
+        """
+        with self.lock:
+            self.aleatorio = aleatorio
+            self.ordenar(actual)
+
+
+class TypeAheadSearch:
+    """
+    Búsqueda incremental por texto sobre una lista de canciones.
+    Los textos se normalizan una sola vez, y si la consulta nueva extiende la anterior
+    solo se filtran los resultados anteriores en lugar de toda la lista.
+    """
+    def __init__(self, textos):
+        """
+        Prepara los textos de búsqueda (uno por canción).
+        """
+        self.textos = [normalizar(texto) for texto in textos]
+        self.consulta = ""
+        self.resultados = None
+
+    def actualizar(self, index, texto):
+        """
+        Cambia el texto de una canción (por ejemplo, al llegar sus metadatos).
+        """
+        self.textos[index] = normalizar(texto)
+        self.resultados = None
+
+    def buscar(self, consulta):
+        """
+        Devuelve los índices de las canciones que contienen todas las palabras de la consulta.
+        """
+        consulta = normalizar(consulta.strip())
+        palabras = consulta.split()
+        if not palabras:
+            self.consulta, self.resultados = "", None
+            return range(len(self.textos))
+
+        textos = self.textos
+        if self.resultados is not None and consulta.startswith(self.consulta):
+            candidatos = self.resultados
+        else:
+            candidatos = range(len(textos))
+        # Se filtra palabra por palabra, empezando por la más larga (la más selectiva).
+        resultados = candidatos
+        for palabra in sorted(palabras, key=len, reverse=True):
+            resultados = [i for i in resultados if palabra in textos[i]]
+        self.consulta, self.resultados = consulta, resultados
+        return resultados
+
+
+# Prueba de rendimiento: escribe consultas letra por letra sobre 20 000 canciones
+# y comprueba el modo aleatorio sin repeticiones.
+if __name__ == "__main__":
+    import sys
+    from time import perf_counter
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    random.seed(1)
+    palabras = ["amor", "noche", "corazón", "vida", "canción", "sol", "mar", "tiempo", "fuego",
+                "luna", "camino", "sueño", "ciudad", "baile", "lluvia", "río", "cielo", "Ángel"]
+    artistas = [f"{random.choice(palabras).title()} {random.choice(palabras).title()} Band" for _ in range(400)]
+    textos = [
+        f"{' '.join(random.choices(palabras, k=3))} {random.choice(artistas)} Álbum {i % 1500} pista{i:05d}.mp3"
+        for i in range(n)
+    ]
+
+    inicio = perf_counter()
+    buscador = TypeAheadSearch(textos)
+    print(f"Índice de búsqueda de {n} canciones: {(perf_counter() - inicio) * 1000:.1f} ms")
+
+    peor = 0.0
+    for consulta in ("corazon", "sol band", "album 12", "lluvia cielo angel", "pista19999"):
+        buscador.buscar("")
+        tiempos = []
+        for k in range(1, len(consulta) + 1):
+            inicio = perf_counter()
+            resultados = buscador.buscar(consulta[:k])
+            tiempos.append((perf_counter() - inicio) * 1000)
+        peor = max(peor, max(tiempos))
+        print(f"{consulta!r}: {len(resultados)} resultados, máx {max(tiempos):.2f} ms, "
+              f"media {sum(tiempos) / len(tiempos):.2f} ms por tecla")
+    print(f"Peor tecla: {peor:.2f} ms ({'dentro' if peor < 16 else 'fuera'} del objetivo de 16 ms)")
+
+    lista = Playlist(list(range(n)), aleatorio=True)
+    sonadas = [lista.orden[lista.pos]]
+    for _ in range(2 * n - 1):
+        siguiente = lista.proximo(sonadas[-1])
+        lista.comenzo(siguiente)
+        sonadas.append(siguiente)
+    vueltas = (sonadas[:n], sonadas[n:])
+    sin_repetir = all(len(set(vuelta)) == n for vuelta in vueltas)
+    print(f"Aleatorio: 2 vueltas de {n} canciones sin repetir: {sin_repetir}, "
+          f"sin repetir entre vueltas: {sonadas[n - 1] != sonadas[n]}")
@@ -20,6 +20,7 @@ class RedInterface:
         self.is_connected = False
         self.wifi_manager = WifiManager()
         self.network_index = 0
+        self.mostrada = False
         self.obtener_estado_inicial()
 
     def obtener_estado_inicial(self):
@@ -35,6 +36,15 @@ class RedInterface:
         """
         return sorted(list(set(networks)))
 
+    def on_show(self):
+        """
+        Actualiza el estado de conexión cada vez que se vuelve a mostrar la pantalla.
+        La primera vez se usa el estado obtenido al construirla.
+        """
+        if self.mostrada:
+            self.actualizar_estado_conexion()
+        self.mostrada = True
+
     def mostrar_interfaz_red(self):
         """
         Configura la interfaz gráfica para la gestión de redes.
@@ -0,0 +1,58 @@
+class ScreenManager:
+    """
+    Clase para gestionar las pantallas de la aplicación.
+    Cada pantalla se construye una sola vez y se conserva en memoria; al navegar
+    solo se empaqueta o desempaqueta su frame y se llaman sus ganchos on_show/on_hide.
+    """
+    def __init__(self):
+        """
+        Inicializa el registro de pantallas y la pantalla activa.
+        """
+        self.factories = {}
+        self.screens = {}
+        self.current = None
+
+    def register(self, name, factory):
+        """
+        Registra una pantalla. `factory` se llama una sola vez, la primera vez que se
+        muestra, y debe devolver un objeto con un atributo `current_frame` ya construido.
+        """
+        self.factories[name] = factory
+
+    def get(self, name):
+        """
+        Devuelve la pantalla indicada, construyéndola si aún no existe.
+        """
+        if name not in self.screens:
+            screen = self.factories[name]()
+            screen.current_frame.pack_forget()
+            self.screens[name] = screen
+        return self.screens[name]
+
+    def show(self, name):
+        """
+        Oculta la pantalla activa y muestra la pantalla indicada.
+        """
+        if self.current == name:
+            return
+        screen = self.get(name)
+
+        if self.current is not None:
+            anterior = self.screens[self.current]
+            self.call_hook(anterior, "on_hide")
+            anterior.current_frame.pack_forget()
+
+        self.current = name
+        screen.current_frame.pack(fill="both", expand=True)
+        self.call_hook(screen, "on_show")
+
+    def call_hook(self, screen, hook):
+        """
+        Llama al gancho de ciclo de vida de una pantalla si lo define.
+        """
+        callback = getattr(screen, hook, None)
+        if callback:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error en {hook} de la pantalla: {e}")
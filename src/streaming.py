@@ -1,5 +1,5 @@
 import tkinter as tk
-from PIL import Image, ImageTk
+from asset_cache import cargar_imagen
 from screeninfo import get_monitors
 import subprocess
 import os
@@ -33,10 +33,7 @@ class StreamingInterface:
         screen_width = monitor.width
         screen_height = monitor.height
 
-        fondo_img = Image.open("img_interfaz/Fondo.jpg").resize(
-            (screen_width, screen_height), Image.Resampling.LANCZOS
-        )
-        fondo = ImageTk.PhotoImage(fondo_img)
+        fondo = cargar_imagen("img_interfaz/Fondo.jpg", (screen_width, screen_height))
         fondo_label = tk.Label(self.current_frame, image=fondo)
         fondo_label.image = fondo
         fondo_label.place(x=0, y=0, relwidth=1, relheight=1)
@@ -109,8 +106,7 @@ class StreamingInterface:
         y_start = (screen_height - total_height) // 2
 
         for i, boton in enumerate(botones):
-            img = Image.open(boton["path"]).resize((button_width, button_height), Image.Resampling.LANCZOS)
-            boton_img = ImageTk.PhotoImage(img)
+            boton_img = cargar_imagen(boton["path"], (button_width, button_height))
 
             button = tk.Button(
                 self.current_frame,
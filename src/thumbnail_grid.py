@@ -0,0 +1,281 @@
+import os
+import hashlib
+import tkinter as tk
+from urllib.parse import quote
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from PIL import Image, ImageOps, ImageTk
+from PIL.PngImagePlugin import PngInfo
+from tk_bridge import TkBridge
+
+
+TAMANO_MINIATURA = 256
+
+
+def thumbnail_dir():
+    """
+    Devuelve el directorio de miniaturas con la estructura de freedesktop (tamaño "large").
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "thumbnails", "large")
+
+
+def thumbnail_uri(path):
+    """
+    Devuelve la URI file:// de una imagen, usada como clave de su miniatura.
+    """
+    return "file://" + quote(os.path.abspath(path))
+
+
+def thumbnail_path(path):
+    """
+    Devuelve la ruta de la miniatura en caché: md5 de la URI del archivo original.
+    """
+    name = hashlib.md5(thumbnail_uri(path).encode("utf-8")).hexdigest()
+    return os.path.join(thumbnail_dir(), name + ".png")
+
+
+def miniatura_valida(path, thumb_path):
+    """
+    Comprueba que la miniatura exista y corresponda al tamaño y la fecha de modificación
+    actuales del archivo original (campos Thumb::MTime y Thumb::Size).
+    """
+    try:
+        st = os.stat(path)
+        with Image.open(thumb_path) as thumb:
+            info = thumb.info
+            return (info.get("Thumb::MTime") == str(int(st.st_mtime))
+                    and info.get("Thumb::Size") == str(st.st_size))
+    except (OSError, ValueError):
+        return False
+
+
+def generar_miniatura(path, thumb_path, size=TAMANO_MINIATURA):
+    """
+    Genera, guarda y devuelve la miniatura de una imagen. Se ejecuta en un proceso del grupo.
+    """
+    st = os.stat(path)
+    with Image.open(path) as img:
+        img.draft("RGB", (size, size))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((size, size), Image.Resampling.BICUBIC)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+
+        info = PngInfo()
+        info.add_text("Thumb::URI", thumbnail_uri(path))
+        info.add_text("Thumb::MTime", str(int(st.st_mtime)))
+        info.add_text("Thumb::Size", str(st.st_size))
+
+        os.makedirs(os.path.dirname(thumb_path), mode=0o700, exist_ok=True)
+        tmp_path = f"{thumb_path}.{os.getpid()}.tmp"
+        try:
+            img.save(tmp_path, format="PNG", pnginfo=info)
+            os.replace(tmp_path, thumb_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return img
+
+
+def cargar_miniatura(path, thumb_path, size=TAMANO_MINIATURA):
+    """
+    Devuelve la miniatura ya decodificada de una imagen: la lee de la caché si es válida
+    o la genera. Se ejecuta en un proceso del grupo para que el hilo de Tk no toque el disco.
+    """
+    if miniatura_valida(path, thumb_path):
+        with Image.open(thumb_path) as thumb:
+            thumb.load()
+            return thumb.copy()
+    return generar_miniatura(path, thumb_path, size)
+
+
+class ThumbnailGrid:
+    """
+    Clase para explorar las fotos del USB en una cuadrícula de miniaturas.
+    Solo dibuja las filas visibles en un Canvas. Las miniaturas se validan, leen o generan
+    bajo demanda en un grupo de procesos (con caché en disco) y al hilo de Tk solo llega
+    la imagen lista para crear el PhotoImage.
+    """
+    def __init__(self, root, image_paths, abrir_callback, volver_callback, workers=None):
+        """
+        Inicializa la cuadrícula. `abrir_callback(index)` se llama al tocar una miniatura.
+        """
+        self.root = root
+        self.image_paths = image_paths
+        self.abrir_callback = abrir_callback
+        self.volver_callback = volver_callback
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.current_frame = None
+        self.canvas = None
+        self.executor = None
+        self.bridge = None
+        self.visibles = {}
+        self.pendientes = {}
+        self.fallidas = set()
+        self.columnas = 1
+        self.celda = TAMANO_MINIATURA + 16
+
+    def mostrar_cuadricula(self):
+        """
+        Configura la interfaz gráfica de la cuadrícula de miniaturas.
+        """
+        self.current_frame = tk.Frame(self.root, bg="black")
+        self.current_frame.pack(fill="both", expand=True)
+
+        barra_sup = tk.Frame(self.current_frame, bg="#003264")
+        barra_sup.pack(side="top", fill="x")
+
+        tk.Button(
+            barra_sup,
+            text="Volver",
+            font=("Arial", 12),
+            bg="#00FFFF",
+            fg="black",
+            command=self.volver
+        ).pack(side="left", padx=10, pady=10)
+
+        tk.Label(
+            barra_sup,
+            text=f"Fotos ({len(self.image_paths)})",
+            font=("Arial", 24),
+            bg="#003264",
+            fg="white"
+        ).pack(side="left", expand=True)
+
+        tk.Button(
+            barra_sup,
+            text="Presentación",
+            font=("Arial", 12),
+            bg="#00FFFF",
+            fg="black",
+            command=lambda: self.abrir_callback(0)
+        ).pack(side="right", padx=10, pady=10)
+
+        scrollbar = tk.Scrollbar(self.current_frame, orient="vertical", command=self.desplazar)
+        scrollbar.pack(side="right", fill="y")
+
+        self.canvas = tk.Canvas(self.current_frame, bg="black", highlightthickness=0, yscrollcommand=scrollbar.set)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.canvas.bind("<Configure>", self.redimensionar)
+        self.canvas.bind("<Button-1>", self.seleccionar)
+        self.canvas.bind("<MouseWheel>", lambda e: self.desplazar("scroll", -1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda e: self.desplazar("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.desplazar("scroll", 1, "units"))
+
+        self.bridge = TkBridge(self.root, self.miniatura_lista)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"))
+
+    def redimensionar(self, event):
+        """
+        Recalcula columnas y región de desplazamiento cuando cambia el tamaño del Canvas.
+        """
+        columnas = max(1, event.width // self.celda)
+        if columnas != self.columnas:
+            self.columnas = columnas
+            self.canvas.delete("all")
+            self.visibles.clear()
+        filas = (len(self.image_paths) + self.columnas - 1) // self.columnas
+        self.canvas.config(
+            scrollregion=(0, 0, self.columnas * self.celda, filas * self.celda),
+            yscrollincrement=self.celda // 4,
+        )
+        self.actualizar_visibles()
+
+    def desplazar(self, *args):
+        """
+        Desplaza el Canvas y actualiza las miniaturas visibles.
+        """
+        self.canvas.yview(*args)
+        self.actualizar_visibles()
+
+    def rango_visible(self):
+        """
+        Devuelve el rango de índices de las filas visibles más una fila de margen.
+        """
+        top = self.canvas.canvasy(0)
+        alto = self.canvas.winfo_height()
+        primera = max(0, int(top // self.celda) - 1)
+        ultima = int((top + alto) // self.celda) + 1
+        inicio = primera * self.columnas
+        fin = min(len(self.image_paths), (ultima + 1) * self.columnas)
+        return range(inicio, fin)
+
+    def actualizar_visibles(self):
+        """
+        Dibuja las miniaturas que entraron en pantalla, elimina las que salieron y
+        cancela las generaciones pendientes que ya no son visibles.
+        """
+        visibles = self.rango_visible()
+
+        for index in list(self.visibles):
+            if index not in visibles:
+                self.canvas.delete(self.visibles.pop(index)[0])
+        for index in list(self.pendientes):
+            if index not in visibles and self.pendientes[index].cancel():
+                del self.pendientes[index]
+
+        for index in visibles:
+            if index not in self.visibles:
+                self.dibujar(index)
+
+    def dibujar(self, index):
+        """
+        Solicita al grupo de procesos la miniatura de `index`, salvo que ya esté pendiente
+        o que haya fallado antes.
+        """
+        path = self.image_paths[index]
+        if index in self.pendientes or path in self.fallidas:
+            return
+        future = self.executor.submit(cargar_miniatura, path, thumbnail_path(path))
+        future.add_done_callback(lambda f, i=index: self.bridge.put(i) if not f.cancelled() else None)
+        self.pendientes[index] = future
+
+    def miniatura_lista(self, index):
+        """
+        Recibe en el hilo de Tk una miniatura lista y la dibuja si sigue visible.
+        Las que fallaron se recuerdan para no volver a enviarlas al grupo.
+        """
+        future = self.pendientes.pop(index, None)
+        if future is None or self.canvas is None:
+            return
+        if future.exception():
+            print(f"Error al generar la miniatura de {self.image_paths[index]}: {future.exception()}")
+            self.fallidas.add(self.image_paths[index])
+            return
+        if index in self.rango_visible() and index not in self.visibles:
+            foto = ImageTk.PhotoImage(future.result())
+            x = (index % self.columnas) * self.celda + self.celda // 2
+            y = (index // self.columnas) * self.celda + self.celda // 2
+            item = self.canvas.create_image(x, y, image=foto)
+            self.visibles[index] = (item, foto)
+
+    def seleccionar(self, event):
+        """
+        Abre la presentación a partir de la miniatura tocada.
+        """
+        x = self.canvas.canvasx(event.x)
+        y = self.canvas.canvasy(event.y)
+        columna = int(x // self.celda)
+        if columna >= self.columnas:
+            return
+        index = int(y // self.celda) * self.columnas + columna
+        if index < len(self.image_paths):
+            self.abrir_callback(index)
+
+    def volver(self):
+        """
+        Cancela las miniaturas pendientes, cierra el grupo de procesos y regresa.
+        """
+        for future in self.pendientes.values():
+            future.cancel()
+        self.pendientes.clear()
+        if self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+        if self.bridge:
+            self.bridge.cerrar()
+        self.canvas = None
+        self.visibles.clear()
+        self.current_frame.destroy()
+        self.volver_callback()
@@ -0,0 +1,124 @@
+import tkinter as tk
+from collections import deque
+from threading import Thread, Event
+from time import sleep
+
+
+class TkBridge:
+    """
+    Puente para entregar eventos desde cualquier hilo al hilo de Tk.
+    Los eventos se guardan en una deque (append y popleft son atómicos, sin candados) y
+    se despierta el bucle de Tk con un evento virtual, de modo que no hace falta sondear
+    mientras no hay actividad.
+    El evento virtual lo genera un hilo propio del puente: con Tcl en modo multihilo,
+    event_generate desde otro hilo espera a que Tk lo atienda, y hacerlo desde el hilo
+    que produce los eventos (por ejemplo, el de libvlc) puede bloquear la aplicación.
+    """
+    def __init__(self, root, callback):
+        """
+        Inicializa el puente y registra el evento virtual en la ventana dada.
+        `callback` se llama en el hilo de Tk con cada evento recibido.
+        """
+        self.root = root
+        self.callback = callback
+        self.events = deque()
+        self.closed = False
+        self.signal = Event()
+        self.sequence = f"<<TkBridge{id(self)}>>"
+        self.bind_id = self.root.bind(self.sequence, self.drenar, add="+")
+        self.waker = Thread(target=self.despertar, daemon=True)
+        self.waker.start()
+
+    def put(self, event):
+        """
+        Encola un evento y avisa al hilo despertador. Puede llamarse desde cualquier hilo
+        (misma interfaz que Queue.put) y nunca bloquea.
+        """
+        if self.closed:
+            return
+        self.events.append(event)
+        self.signal.set()
+
+    def despertar(self):
+        """
+        Bucle del hilo despertador: genera un evento virtual por cada tanda de eventos.
+        """
+        while True:
+            self.signal.wait()
+            self.signal.clear()
+            if self.closed:
+                return
+            if not self.events:
+                continue
+            try:
+                self.root.event_generate(self.sequence, when="tail")
+            except RuntimeError:
+                # El bucle principal aún no está en marcha; se reintenta en breve.
+                sleep(0.05)
+                self.signal.set()
+            except tk.TclError:
+                return
+
+    def drenar(self, _event=None):
+        """
+        Entrega en el hilo de Tk todos los eventos acumulados.
+        """
+        while self.events:
+            event = self.events.popleft()
+            try:
+                self.callback(event)
+            except Exception as e:
+                print(f"Error al procesar evento: {e}")
+
+    def cerrar(self):
+        """
+        Deja de aceptar eventos, detiene el hilo despertador y elimina el enlace del evento virtual.
+        """
+        self.closed = True
+        self.events.clear()
+        self.signal.set()
+        try:
+            self.root.unbind(self.sequence, self.bind_id)
+        except tk.TclError:
+            pass
+
+
+# Prueba de carga: varios hilos envían miles de eventos y se comprueba que todos
+# llegan al hilo de Tk, en orden por hilo.
+if __name__ == "__main__":
+    from time import perf_counter
+
+    hilos = 8
+    por_hilo = 5000
+    recibidos = {i: [] for i in range(hilos)}
+
+    root = tk.Tk()
+    root.withdraw()
+
+    def recibir(evento):
+        hilo, n = evento
+        recibidos[hilo].append(n)
+        if sum(len(v) for v in recibidos.values()) == hilos * por_hilo:
+            root.quit()
+
+    bridge = TkBridge(root, recibir)
+
+    def fuente(hilo):
+        for n in range(por_hilo):
+            bridge.put((hilo, n))
+
+    def iniciar():
+        for i in range(hilos):
+            Thread(target=fuente, args=(i,), daemon=True).start()
+
+    inicio = perf_counter()
+    root.after(0, iniciar)
+    root.after(30000, root.quit)
+    root.mainloop()
+    duracion = perf_counter() - inicio
+
+    completos = all(recibidos[i] == list(range(por_hilo)) for i in range(hilos))
+    total = sum(len(v) for v in recibidos.values())
+    print(f"{total} de {hilos * por_hilo} eventos recibidos en {duracion:.2f} s, orden correcto: {completos}")
+    bridge.cerrar()
+    root.destroy()
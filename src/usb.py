@@ -1,12 +1,12 @@
 import tkinter as tk
-from PIL import Image, ImageTk
-from threading import Thread
-from queue import Queue
+from asset_cache import cargar_imagen
 from screeninfo import get_monitors
 from image_slideshow import ImageSlideshow
+from thumbnail_grid import ThumbnailGrid
 from audio_usb import AudioUSB
 from video_usb import VideoUSB
-from media_manager import MediaManager
+from device_service import get_device_service
+from tk_bridge import TkBridge
 
 class USBInterface:
     """
@@ -20,14 +20,13 @@ class USBInterface:
         self.root = root
         self.volver_callback = volver_callback
         self.current_frame = None
-        self.media_manager = MediaManager()
-        self.queue = Queue()
-        self.hilo_dispositivo = Thread(target=self.media_manager.monitor_devices, args=(self.queue,), daemon=True)
-        self.hilo_dispositivo.start()
+        self.device_service = get_device_service()
+        self.bridge = TkBridge(self.root, self.actualizar_interfaz_usb)
         self.imagenes = []
         self.audio_files = []
         self.video_files = []
         self.buttons = {}
+        self.video_usb = None
 
     def limpiar_frame(self):
         """
@@ -39,10 +38,23 @@ class USBInterface:
             self.current_frame.destroy()
             self.current_frame = None
 
+    def on_show(self):
+        """
+        Se suscribe al servicio de dispositivos para recibir sus actualizaciones.
+        """
+        self.device_service.subscribe(self.bridge)
+
+    def on_hide(self):
+        """
+        Cancela la suscripción mientras la pantalla está oculta.
+        """
+        self.device_service.unsubscribe(self.bridge)
+
     def mostrar_interfaz_usb(self):
         """
         Configura y muestra la interfaz gráfica de USB.
         """
+        self.on_hide()
         self.limpiar_frame()
         self.current_frame = tk.Frame(self.root)
         self.current_frame.pack(fill="both", expand=True)
@@ -51,8 +63,7 @@ class USBInterface:
         screen_width = monitor.width
         screen_height = monitor.height
 
-        fondo_img = Image.open("img_interfaz/Fondo.jpg").resize((screen_width, screen_height), Image.Resampling.LANCZOS)
-        fondo = ImageTk.PhotoImage(fondo_img)
+        fondo = cargar_imagen("img_interfaz/Fondo.jpg", (screen_width, screen_height))
         fondo_label = tk.Label(self.current_frame, image=fondo)
         fondo_label.image = fondo
         fondo_label.place(x=0, y=0, relwidth=1, relheight=1)
@@ -89,7 +100,7 @@ class USBInterface:
         barra_inf.place(x=0, y=screen_height - screen_height // 15, width=screen_width, height=screen_height // 15)
 
         self.crear_botones_usb(screen_width, screen_height)
-        self.actualizar_interfaz_usb()
+        self.on_show()
 
     def crear_botones_usb(self, screen_width, screen_height):
         """
@@ -107,8 +118,7 @@ class USBInterface:
         y_start = screen_height // 3
 
         for i, boton in enumerate(botones):
-            img = Image.open(boton["path"]).resize((button_width, button_height), Image.Resampling.LANCZOS)
-            boton_img = ImageTk.PhotoImage(img)
+            boton_img = cargar_imagen(boton["path"], (button_width, button_height))
             button = tk.Button(
                 self.current_frame,
                 image=boton_img,
@@ -134,8 +144,7 @@ class USBInterface:
 
         if label == "Fotos":
             if self.imagenes:
-                slideshow = ImageSlideshow(nueva_ventana, self.imagenes, nueva_ventana.destroy)
-                slideshow.mostrar_presentacion()
+                self.mostrar_fotos(nueva_ventana, self.imagenes)
             else:
                 tk.Label(
                     nueva_ventana, 
@@ -155,7 +164,7 @@ class USBInterface:
                 ).pack(pady=20)
         elif label == "Video":
             if self.video_files:
-                VideoUSB(nueva_ventana, nueva_ventana.destroy, self.video_files)
+                self.video_usb = VideoUSB(nueva_ventana, nueva_ventana.destroy, self.video_files)
             else:
                 tk.Label(
                     nueva_ventana, 
@@ -164,30 +173,39 @@ class USBInterface:
                     fg="red"
                 ).pack(pady=20)
 
-    def actualizar_interfaz_usb(self):
+    def mostrar_fotos(self, ventana, imagenes):
         """
-        Actualiza el estado de la interfaz según los dispositivos conectados.
+        Muestra la cuadrícula de miniaturas; al tocar una foto se abre la presentación
+        desde ella y al regresar se vuelve a la cuadrícula.
+        """
+        def abrir_presentacion(index):
+            cuadricula.current_frame.pack_forget()
+            slideshow = ImageSlideshow(
+                ventana,
+                imagenes,
+                lambda: cuadricula.current_frame.pack(fill="both", expand=True),
+                inicio=index
+            )
+            slideshow.mostrar_presentacion()
+
+        cuadricula = ThumbnailGrid(ventana, imagenes, abrir_presentacion, ventana.destroy)
+        cuadricula.mostrar_cuadricula()
+
+    def actualizar_interfaz_usb(self, evento):
+        """
+        Actualiza el estado de la interfaz con las vistas combinadas de todos los dispositivos.
+        Se ejecuta en el hilo de Tk en cuanto llega el evento.
         """
         try:
-            while not self.queue.empty():
-                action, images, audio_files, video_files = self.queue.get()
-
-                if action == "add":
-                    self.imagenes = images
-                    self.audio_files = audio_files
-                    self.video_files = video_files
-
-                    self.buttons["Fotos"].config(state="normal" if images else "disabled")
-                    self.buttons["Música"].config(state="normal" if audio_files else "disabled")
-                    self.buttons["Video"].config(state="normal" if video_files else "disabled")
-                elif action == "remove":
-                    self.imagenes.clear()
-                    self.audio_files.clear()
-                    self.video_files.clear()
-
-                    for button in self.buttons.values():
-                        button.config(state="disabled")
+            _, images, audio_files, video_files = evento
+            self.imagenes = images
+            self.audio_files = audio_files
+            self.video_files = video_files
+            if self.video_usb:
+                self.video_usb.cancelar_indexado(video_files)
+
+            self.buttons["Fotos"].config(state="normal" if images else "disabled")
+            self.buttons["Música"].config(state="normal" if audio_files else "disabled")
+            self.buttons["Video"].config(state="normal" if video_files else "disabled")
         except Exception as e:
             print(f"Error al actualizar la interfaz: {e}")
-
-        self.root.after(1000, self.actualizar_interfaz_usb)
@@ -0,0 +1,200 @@
+import os
+import json
+import shutil
+import hashlib
+import subprocess as sp
+import vlc
+from time import sleep
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from vlc_player import get_player_service
+
+
+def default_cache_dir():
+    """
+    Devuelve el directorio de caché de carátulas y duraciones de video.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "centro_multimedia", "videos")
+
+
+def formatear_duracion(ms):
+    """
+    Convierte una duración en milisegundos a texto h:mm:ss o m:ss.
+    """
+    segundos = int(ms // 1000)
+    horas, segundos = divmod(segundos, 3600)
+    minutos, segundos = divmod(segundos, 60)
+    if horas:
+        return f"{horas}:{minutos:02d}:{segundos:02d}"
+    return f"{minutos}:{segundos:02d}"
+
+
+class VideoInfoService:
+    """
+    Servicio para extraer la carátula y la duración de los videos en segundo plano.
+    Usa ffprobe/ffmpeg si están instalados y libvlc en caso contrario (solo duración).
+    Los resultados se guardan en disco según la identidad del archivo (ruta, tamaño y
+    fecha de modificación) y el trabajo pendiente puede cancelarse.
+    """
+    def __init__(self, cache_dir=None, workers=2, poster_width=320, timeout=20):
+        """
+        Inicializa el grupo de hilos acotado y detecta las herramientas disponibles.
+        """
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.poster_width = poster_width
+        self.timeout = timeout
+        self.ffprobe = shutil.which("ffprobe")
+        self.ffmpeg = shutil.which("ffmpeg")
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.lock = Lock()
+        self.futures = {}
+
+    def cache_key(self, path):
+        """
+        Devuelve la clave de caché del archivo, o None si ya no existe.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def cached(self, path):
+        """
+        Devuelve la información guardada {"duration": ms, "poster": ruta o None}, o None.
+        """
+        key = self.cache_key(path)
+        if key is None:
+            return None
+        try:
+            with open(os.path.join(self.cache_dir, key + ".json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def request(self, path, callback):
+        """
+        Solicita la información de un video. `callback(path, info)` se llama desde un
+        hilo de trabajo cuando termina; no se repiten solicitudes pendientes.
+        """
+        with self.lock:
+            if path in self.futures:
+                return
+            future = self.executor.submit(self.extraer, path)
+            self.futures[path] = future
+        future.add_done_callback(lambda f: self.terminado(path, f, callback))
+
+    def terminado(self, path, future, callback):
+        """
+        Retira una solicitud terminada y entrega su resultado.
+        """
+        with self.lock:
+            self.futures.pop(path, None)
+        if future.cancelled():
+            return
+        if future.exception():
+            print(f"Error al analizar el video {path}: {future.exception()}")
+            return
+        if future.result() is not None:
+            callback(path, future.result())
+
+    def cancel(self, keep=None):
+        """
+        Cancela las solicitudes pendientes, salvo las de rutas incluidas en `keep`.
+        """
+        with self.lock:
+            for path, future in list(self.futures.items()):
+                if keep is None or path not in keep:
+                    future.cancel()
+
+    def close(self):
+        """
+        Cancela todo el trabajo pendiente y libera el grupo de hilos.
+        """
+        self.cancel()
+        self.executor.shutdown(wait=False)
+
+    def extraer(self, path):
+        """
+        Extrae la duración y la carátula de un video y guarda el resultado.
+        Si ffprobe o ffmpeg tardan demasiado o no se pueden ejecutar, se guarda el video
+        sin duración ni carátula para no volver a analizarlo en cada visita.
+        Se ejecuta en un hilo de trabajo.
+        """
+        key = self.cache_key(path)
+        if key is None:
+            return None
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        try:
+            if self.ffprobe:
+                duration = self.duracion_ffprobe(path)
+            else:
+                duration = self.duracion_vlc(path)
+
+            poster = None
+            if self.ffmpeg:
+                poster = self.caratula_ffmpeg(path, os.path.join(self.cache_dir, key + ".jpg"), duration)
+        except (sp.TimeoutExpired, OSError) as e:
+            print(f"Error al analizar el video {path}: {e}")
+            duration, poster = None, None
+
+        info = {"duration": duration, "poster": poster}
+        tmp_path = os.path.join(self.cache_dir, f"{key}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(info, f)
+        os.replace(tmp_path, os.path.join(self.cache_dir, key + ".json"))
+        return info
+
+    def duracion_ffprobe(self, path):
+        """
+        Obtiene la duración en milisegundos con ffprobe.
+        """
+        cp = sp.run(
+            [self.ffprobe, "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", path],
+            capture_output=True, text=True, timeout=self.timeout
+        )
+        try:
+            return int(float(cp.stdout.strip()) * 1000)
+        except ValueError:
+            return None
+
+    def duracion_vlc(self, path):
+        """
+        Obtiene la duración en milisegundos analizando el archivo con la instancia
+        compartida de libvlc.
+        """
+        media = get_player_service().instance.media_new(path)
+        try:
+            media.parse_with_options(vlc.MediaParseFlag.local, self.timeout * 1000)
+            for _ in range(self.timeout * 20):
+                if media.get_parsed_status() != 0:
+                    break
+                sleep(0.05)
+            duration = media.get_duration()
+            return duration if duration > 0 else None
+        finally:
+            media.release()
+
+    def caratula_ffmpeg(self, path, poster_path, duration):
+        """
+        Extrae un cuadro representativo (10 % del video, máximo 10 s) con ffmpeg.
+        """
+        offset = min(duration * 0.1 / 1000, 10) if duration else 0
+        tmp_path = poster_path + ".tmp.jpg"
+        try:
+            cp = sp.run(
+                [self.ffmpeg, "-v", "error", "-y", "-ss", f"{offset:.2f}", "-i", path,
+                 "-frames:v", "1", "-vf", f"scale={self.poster_width}:-2", tmp_path],
+                capture_output=True, timeout=self.timeout
+            )
+            if cp.returncode != 0 or not os.path.exists(tmp_path):
+                return None
+            os.replace(tmp_path, poster_path)
+            return poster_path
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -1,8 +1,14 @@
+import os
 import tkinter as tk
-from PIL import Image, ImageTk
+from asset_cache import cargar_imagen
 import vlc
-import platform
 from screeninfo import get_monitors
+from virtual_list import VirtualList
+from video_info import VideoInfoService, formatear_duracion
+from tk_bridge import TkBridge
+from vlc_player import get_player_service, VlcEventBridge
+
+PRESENTACION_BUCLE = os.environ.get("CENTRO_MULTIMEDIA_PRESENTACION_BUCLE", "0") == "1"
 
 
 class VideoUSB:
@@ -10,9 +16,10 @@ class VideoUSB:
     Clase para gestionar la selección y reproducción de videos desde un dispositivo USB.
     Permite la reproducción individual o en secuencia.
     """
-    def __init__(self, root, volver_callback, videos):
+    def __init__(self, root, volver_callback, videos, bucle=PRESENTACION_BUCLE):
         """
         Inicializa la interfaz de videos y la lista de videos disponibles.
+        Con `bucle` la presentación vuelve a empezar al terminar, como en un letrero.
         """
         self.root = root
         self.volver_callback = volver_callback
@@ -20,21 +27,44 @@ class VideoUSB:
         self.current_frame = None
         self.player = None
         self.current_video_index = 0
+        self.video_offset = 0
+        self.lista_videos = None
         self.presentacion_activa = False
+        self.presentacion_bucle = bucle
+        self.list_player = None
+        self.lista_presentacion = None
+        self.titulo_video = None
+        self.info_videos = {}
+        self.tamano_caratula = (1, 1)
+        self.video_info = VideoInfoService()
+        self.bridge = TkBridge(self.root, self.info_video_lista)
+        self.eventos_vlc = VlcEventBridge(self.root)
         self.mostrar_interfaz_video()
 
     def limpiar_frame(self):
         """
         Limpia el frame actual y detiene la reproducción en curso.
         """
-        if self.player and self.player.is_playing():
-            self.player.stop()
+        if self.presentacion_activa:
+            self.detener_presentacion()
+        self.detener_reproductor()
+        if self.lista_videos:
+            self.video_offset = self.lista_videos.offset
+            self.lista_videos = None
         if self.current_frame:
             for widget in self.current_frame.winfo_children():
                 widget.destroy()
             self.current_frame.destroy()
             self.current_frame = None
 
+    def detener_reproductor(self):
+        """
+        Registra los contadores de cuadros del video en curso y detiene el reproductor.
+        """
+        if self.player and self.player.is_playing():
+            get_player_service().registrar_estadisticas("video")
+            self.player.stop()
+
     def mostrar_interfaz_video(self):
         """
         Configura y muestra la interfaz gráfica de selección de videos.
@@ -47,8 +77,7 @@ class VideoUSB:
         screen_width = monitor.width
         screen_height = monitor.height
 
-        fondo_img = Image.open("img_interfaz/Fondo.jpg").resize((screen_width, screen_height), Image.Resampling.LANCZOS)
-        fondo = ImageTk.PhotoImage(fondo_img)
+        fondo = cargar_imagen("img_interfaz/Fondo.jpg", (screen_width, screen_height))
         fondo_label = tk.Label(self.current_frame, image=fondo)
         fondo_label.image = fondo
         fondo_label.place(x=0, y=0, relwidth=1, relheight=1)
@@ -115,36 +144,90 @@ class VideoUSB:
 
     def crear_botones_videos(self, screen_width, screen_height):
         """
-        Genera los botones para cada video disponible en la lista.
+        Genera la lista virtualizada de videos: solo se crean los botones visibles
+        y se reutilizan al desplazarse o cambiar de página.
         """
         max_columns = 2
         button_width = screen_width // 4
         button_height = screen_height // 10
         margin_x = screen_width // 20
         margin_y = screen_height // 40
-        start_x = (screen_width - max_columns * (button_width + margin_x)) // 2
+        nav_width = screen_width // 20
+        list_width = max_columns * (button_width + margin_x) + nav_width
+        start_x = (screen_width - list_width) // 2
         start_y = screen_height // 4
+        list_height = screen_height - screen_height // 15 - margin_y - start_y
+        caratula_alto = button_height - 8
+        self.tamano_caratula = (caratula_alto * 16 // 9, caratula_alto)
 
-        for i, video in enumerate(self.videos):
-            video_name = video.split("/")[-1]
-            col = i % max_columns
-            row = i // max_columns
+        self.lista_videos = VirtualList(
+            self.current_frame,
+            start_x,
+            start_y,
+            list_width,
+            list_height,
+            self.configurar_boton_video,
+            columns=max_columns,
+            row_height=button_height,
+            margin_x=margin_x,
+            margin_y=margin_y,
+            offset=self.video_offset,
+        )
+        self.lista_videos.set_count(len(self.videos))
 
-            x_pos = start_x + col * (button_width + margin_x)
-            y_pos = start_y + row * (button_height + margin_y)
+    def configurar_boton_video(self, button, index):
+        """
+        Asigna a un botón reutilizado el video de la posición `index`, con su carátula y
+        duración si ya se conocen. Si no, las solicita al servicio de información.
+        """
+        video = self.videos[index]
+        info = self.info_videos.get(video)
+        if info is None:
+            info = self.video_info.cached(video)
+            if info is not None:
+                self.info_videos[video] = info
+            else:
+                self.video_info.request(video, lambda path, info: self.bridge.put((path, info)))
 
-            tk.Button(
-                self.current_frame,
-                text=video_name,
-                font=("Arial", 10),
-                bg="#00FFFF",
-                fg="black",
-                command=lambda v=video: self.reproducir_video(v)
-            ).place(x=x_pos, y=y_pos, width=button_width, height=button_height)
+        texto = video.split("/")[-1]
+        caratula = ""
+        if info:
+            if info.get("duration"):
+                texto += f"\n{formatear_duracion(info['duration'])}"
+            if info.get("poster"):
+                try:
+                    caratula = cargar_imagen(info["poster"], self.tamano_caratula, disco=False)
+                except Exception as e:
+                    print(f"Error al cargar la carátula: {e}")
 
-    def reproducir_video(self, video_path):
+        button.config(
+            text=texto,
+            image=caratula,
+            compound="left" if caratula else "none",
+            command=lambda v=video: self.reproducir_video(v)
+        )
+
+    def info_video_lista(self, resultado):
         """
-        Reproduce un video seleccionado en la pantalla.
+        Recibe en el hilo de Tk la información de un video y actualiza la lista si está visible.
+        """
+        path, info = resultado
+        self.info_videos[path] = info
+        if self.lista_videos:
+            visibles = self.videos[self.lista_videos.offset:self.lista_videos.offset + self.lista_videos.page_size]
+            if path in visibles:
+                self.lista_videos.refresh()
+
+    def cancelar_indexado(self, disponibles=None):
+        """
+        Cancela la extracción pendiente de los videos que ya no están disponibles,
+        por ejemplo al desconectar el dispositivo.
+        """
+        self.video_info.cancel(keep=set(disponibles) if disponibles is not None else None)
+
+    def mostrar_reproductor(self, titulo):
+        """
+        Construye la pantalla de reproducción y devuelve el frame donde se dibuja el video.
         """
         self.limpiar_frame()
         self.current_frame = tk.Frame(self.root)
@@ -154,14 +237,14 @@ class VideoUSB:
         screen_width = monitor.width
         screen_height = monitor.height
 
-        barra_sup = tk.Label(
+        self.titulo_video = tk.Label(
             self.current_frame,
             bg="#003264",
             fg="white",
             font=("Arial", 24),
-            text="Reproduciendo Video"
+            text=titulo
         )
-        barra_sup.place(x=0, y=0, width=screen_width, height=screen_height // 10)
+        self.titulo_video.place(x=0, y=0, width=screen_width, height=screen_height // 10)
 
         volver_btn = tk.Button(
             self.current_frame,
@@ -175,54 +258,91 @@ class VideoUSB:
 
         video_frame = tk.Frame(self.current_frame, bg="black")
         video_frame.place(x=0, y=screen_height // 10, width=screen_width, height=screen_height * 9 // 10)
+        video_frame.update_idletasks()
+        return video_frame
 
-        self.player = vlc.MediaPlayer(video_path)
-
-        if platform.system() == "Linux":
-            self.player.set_xwindow(video_frame.winfo_id())
-        else:
-            self.player.set_hwnd(video_frame.winfo_id())
-
-        self.player.play()
-
-        if self.presentacion_activa:
-            self.player.event_manager().event_attach(
-                vlc.EventType.MediaPlayerEndReached,
-                self.siguiente_video_presentacion
-            )
+    def reproducir_video(self, video_path):
+        """
+        Reproduce un video seleccionado en la pantalla.
+        """
+        video_frame = self.mostrar_reproductor("Reproduciendo Video")
+        self.player = get_player_service().play(video_path, "video", video_frame.winfo_id())
 
     def iniciar_presentacion(self):
         """
         Inicia la reproducción secuencial de todos los videos disponibles.
+        Todos los videos se reproducen sobre la misma superficie con un reproductor de
+        listas de libvlc, y los metadatos del siguiente video se leen mientras suena el actual.
         """
+        video_frame = self.mostrar_reproductor("Presentación")
+        service = get_player_service()
         self.presentacion_activa = True
-        self.current_video_index = 0
-        self.reproducir_video(self.videos[self.current_video_index])
+        self.current_video_index = -1
+        self.player = service.player("video")
+        self.list_player, self.lista_presentacion = service.play_list(
+            self.videos, "video", video_frame.winfo_id(), loop=self.presentacion_bucle
+        )
 
-    def siguiente_video_presentacion(self, event=None):
+        eventos = self.list_player.event_manager()
+        self.eventos_vlc.attach(eventos, vlc.EventType.MediaListPlayerNextItemSet, self.evento_presentacion)
+        self.eventos_vlc.attach(eventos, vlc.EventType.MediaListPlayerPlayed, self.evento_presentacion)
+
+    def evento_presentacion(self, event):
         """
-        Reproduce el siguiente video en la lista durante una presentación.
+        Atiende en el hilo de Tk los eventos del reproductor de listas.
         """
-        self.current_video_index += 1
-        if self.current_video_index < len(self.videos):
-            self.reproducir_video(self.videos[self.current_video_index])
-        else:
-            self.presentacion_activa = False
+        if not self.presentacion_activa:
+            return
+        if event.type == vlc.EventType.MediaListPlayerNextItemSet:
+            self.siguiente_video_presentacion()
+        elif event.type == vlc.EventType.MediaListPlayerPlayed:
+            self.detener_presentacion()
             self.mostrar_interfaz_video()
 
+    def siguiente_video_presentacion(self, event=None):
+        """
+        Actualiza el título con el video que empezó a reproducirse y lee los metadatos del siguiente.
+        Se ejecuta en el hilo de Tk.
+        """
+        self.current_video_index = (self.current_video_index + 1) % len(self.videos)
+        if self.titulo_video:
+            self.titulo_video.config(text=self.videos[self.current_video_index].split("/")[-1])
+        siguiente = self.current_video_index + 1
+        if siguiente >= len(self.videos) and self.presentacion_bucle:
+            siguiente = 0
+        get_player_service().prefetch_metadata(self.lista_presentacion, siguiente)
+
+    def detener_presentacion(self):
+        """
+        Detiene el reproductor de listas y libera la lista de la presentación.
+        """
+        self.presentacion_activa = False
+        if self.list_player:
+            eventos = self.list_player.event_manager()
+            self.eventos_vlc.detach(eventos, vlc.EventType.MediaListPlayerNextItemSet)
+            self.eventos_vlc.detach(eventos, vlc.EventType.MediaListPlayerPlayed)
+            self.list_player.stop()
+            self.list_player = None
+        if self.lista_presentacion:
+            self.lista_presentacion.release()
+            self.lista_presentacion = None
+
     def detener_video_y_volver(self):
         """
         Detiene la reproducción actual y regresa a la lista de videos.
         """
-        if self.player and self.player.is_playing():
-            self.player.stop()
+        if self.presentacion_activa:
+            self.detener_presentacion()
+        self.detener_reproductor()
         self.mostrar_interfaz_video()
 
     def volver(self):
         """
         Detiene cualquier reproducción y regresa a la interfaz anterior.
         """
-        if self.player and self.player.is_playing():
-            self.player.stop()
+        self.detener_reproductor()
+        self.video_info.close()
+        self.bridge.cerrar()
+        self.eventos_vlc.cerrar()
         self.limpiar_frame()
         self.volver_callback()
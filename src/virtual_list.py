@@ -0,0 +1,163 @@
+import tkinter as tk
+
+
+class VirtualList:
+    """
+    Lista virtualizada de botones.
+    Crea solo los botones que caben en el área visible y los reutiliza al desplazarse,
+    de modo que el costo de construcción y la memoria no dependen del número de elementos.
+    """
+    def __init__(self, parent, x, y, width, height, render, columns=1, row_height=40,
+                 margin_x=0, margin_y=0, button_options=None, offset=0):
+        """
+        Crea el conjunto fijo de botones en el rectángulo (x, y, width, height).
+        `render(button, index)` configura el botón que muestra el elemento `index`.
+        Los botones de paginación ocupan una franja a la derecha del área.
+        """
+        self.parent = parent
+        self.render = render
+        self.columns = columns
+        self.count = 0
+        self.offset = offset
+
+        nav_width = max(40, width // 12)
+        list_width = width - nav_width - margin_x
+        cell_width = (list_width - (columns - 1) * margin_x) // columns
+        self.rows = max(1, (height + margin_y) // (row_height + margin_y))
+
+        options = {"font": ("Arial", 10), "bg": "#00FFFF", "fg": "black"}
+        options.update(button_options or {})
+
+        self.slots = []
+        for i in range(self.rows * columns):
+            button = tk.Button(parent, **options)
+            position = {
+                "x": x + (i % columns) * (cell_width + margin_x),
+                "y": y + (i // columns) * (row_height + margin_y),
+                "width": cell_width,
+                "height": row_height,
+            }
+            self.bind_wheel(button)
+            self.slots.append((button, position))
+
+        nav_x = x + width - nav_width
+        self.up_btn = tk.Button(parent, text="↑", font=("Arial", 14), bg="#00FFFF", fg="black",
+                                command=lambda: self.page(-1))
+        self.up_btn.place(x=nav_x, y=y, width=nav_width, height=row_height)
+        self.down_btn = tk.Button(parent, text="↓", font=("Arial", 14), bg="#00FFFF", fg="black",
+                                  command=lambda: self.page(1))
+        self.down_btn.place(x=nav_x, y=y + (self.rows - 1) * (row_height + margin_y),
+                            width=nav_width, height=row_height)
+
+    def bind_wheel(self, widget):
+        """
+        Desplaza la lista con la rueda del ratón sobre `widget`.
+        """
+        widget.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        widget.bind("<Button-4>", lambda e: self.scroll(-1))
+        widget.bind("<Button-5>", lambda e: self.scroll(1))
+
+    @property
+    def page_size(self):
+        """
+        Número de elementos visibles a la vez.
+        """
+        return len(self.slots)
+
+    def set_count(self, count):
+        """
+        Cambia el número total de elementos y vuelve a dibujar la parte visible.
+        """
+        self.count = count
+        self.scroll_to(self.offset)
+
+    def scroll(self, rows):
+        """
+        Desplaza la lista un número de filas (negativo hacia arriba).
+        """
+        self.scroll_to(self.offset + rows * self.columns)
+
+    def page(self, pages):
+        """
+        Desplaza la lista un número de páginas completas.
+        """
+        self.scroll_to(self.offset + pages * self.page_size)
+
+    def scroll_to(self, index):
+        """
+        Coloca el elemento `index` en la primera fila visible (sin salir de los límites).
+        """
+        last_row_start = max(0, self.count - self.page_size)
+        last_row_start = -(-last_row_start // self.columns) * self.columns
+        index = max(0, min(index, last_row_start))
+        self.offset = index - index % self.columns
+        self.refresh()
+
+    def ensure_visible(self, index):
+        """
+        Desplaza la lista lo mínimo necesario para que `index` sea visible.
+        """
+        if index < self.offset:
+            self.scroll_to(index)
+        elif index >= self.offset + self.page_size:
+            self.scroll_to(index - self.page_size + self.columns)
+
+    def refresh(self):
+        """
+        Reasigna los botones existentes a los elementos visibles.
+        """
+        for i, (button, position) in enumerate(self.slots):
+            index = self.offset + i
+            if index < self.count:
+                self.render(button, index)
+                button.place(**position)
+            else:
+                button.place_forget()
+
+        self.up_btn.config(state="normal" if self.offset > 0 else "disabled")
+        self.down_btn.config(state="normal" if self.offset + self.page_size < self.count else "disabled")
+
+
+# Prueba con 10 y con 10 000 elementos en el mismo espacio: el número de widgets y el
+# tiempo de construcción no dependen del tamaño de la lista ni cambian al desplazarse.
+if __name__ == "__main__":
+    from time import perf_counter
+
+    TOLERANCIA_MS = 20
+
+    root = tk.Tk()
+    root.withdraw()
+
+    def construir(total, repeticiones=5):
+        """
+        Construye la lista varias veces y devuelve (marco, lista, mejor tiempo en ms).
+        """
+        mejor = None
+        for _ in range(repeticiones):
+            frame = tk.Frame(root, width=800, height=600)
+            inicio = perf_counter()
+            lista = VirtualList(frame, 0, 0, 800, 600, lambda button, index: button.config(text=f"Elemento {index}"))
+            lista.set_count(total)
+            duracion = (perf_counter() - inicio) * 1000
+            mejor = duracion if mejor is None else min(mejor, duracion)
+        return frame, lista, mejor
+
+    frame_corto, _, tiempo_corta = construir(10)
+    frame, lista, tiempo_larga = construir(10_000)
+    widgets = len(frame.winfo_children())
+    assert widgets == len(frame_corto.winfo_children()), "la lista larga creó más widgets"
+    assert abs(tiempo_larga - tiempo_corta) < TOLERANCIA_MS, "la construcción depende del tamaño"
+
+    inicio = perf_counter()
+    for _ in range(100):
+        lista.page(1)
+    pagina = (perf_counter() - inicio) * 1000 / 100
+    assert len(frame.winfo_children()) == widgets, "page() creó widgets"
+
+    lista.scroll_to(lista.count - 1)
+    assert len(frame.winfo_children()) == widgets, "scroll_to() creó widgets"
+    assert lista.slots[0][0].cget("text") == f"Elemento {lista.offset}"
+
+    print(f"10 elementos: {tiempo_corta:.1f} ms; 10000 elementos: {tiempo_larga:.1f} ms; "
+          f"{widgets} widgets en ambas; {pagina:.2f} ms por página")
+    root.destroy()
@@ -0,0 +1,380 @@
+import os
+import platform
+from collections import namedtuple
+from threading import Lock
+import vlc
+from tk_bridge import TkBridge
+
+
+VlcEvent = namedtuple("VlcEvent", ["type", "value"])
+
+# Perfil de decodificación aplicado a la instancia compartida de libvlc:
+# hw: módulo de decodificación por hardware de avcodec ("any", "none", "drm", "vaapi", ...)
+# threads: hilos de avcodec (0 = automático)
+# skip_loop_filter: 0 ninguno, 1 no referencia, 2 bidireccionales, 3 no clave, 4 todos
+# vout: módulo de salida de video (None = el predeterminado de libvlc)
+PerfilDecodificacion = namedtuple(
+    "PerfilDecodificacion", ["hw", "threads", "skip_loop_filter", "vout"], defaults=("any", 0, 0, None)
+)
+
+PERFILES_DECODIFICACION = {
+    "predeterminado": PerfilDecodificacion(),
+    "software": PerfilDecodificacion(hw="none"),
+    "ligero": PerfilDecodificacion(hw="any", skip_loop_filter=4),
+    "rpi": PerfilDecodificacion(hw="drm", threads=4, skip_loop_filter=1),
+}
+
+
+def argumentos_perfil(nombre):
+    """
+    Devuelve los argumentos de libvlc del perfil de decodificación indicado.
+    """
+    if nombre not in PERFILES_DECODIFICACION:
+        print(f"Perfil de decodificación desconocido: {nombre}; se usa el predeterminado")
+        nombre = "predeterminado"
+    perfil = PERFILES_DECODIFICACION[nombre]
+    args = [
+        f"--avcodec-hw={perfil.hw}",
+        f"--avcodec-threads={perfil.threads}",
+        f"--avcodec-skiploopfilter={perfil.skip_loop_filter}",
+    ]
+    if perfil.vout:
+        args.append(f"--vout={perfil.vout}")
+    return args
+
+
+def perfil_del_equipo():
+    """
+    Elige el perfil de decodificación: el de la variable CENTRO_MULTIMEDIA_PERFIL si
+    está definida, "rpi" en una Raspberry Pi y "predeterminado" en otro caso.
+    """
+    nombre = os.environ.get("CENTRO_MULTIMEDIA_PERFIL")
+    if nombre:
+        return nombre
+    try:
+        with open("/proc/device-tree/model", encoding="utf-8", errors="ignore") as f:
+            if "Raspberry Pi" in f.read():
+                return "rpi"
+    except OSError:
+        pass
+    return "predeterminado"
+
+
+def copiar_evento(event):
+    """
+    Copia los datos útiles de un evento de libvlc, que solo es válido durante el callback.
+    """
+    value = None
+    if event.type == vlc.EventType.MediaPlayerPositionChanged:
+        value = event.u.new_position
+    elif event.type == vlc.EventType.MediaPlayerTimeChanged:
+        value = event.u.new_time
+    elif event.type == vlc.EventType.MediaPlayerLengthChanged:
+        value = event.u.new_length
+    return VlcEvent(event.type, value)
+
+
+class VlcEventBridge:
+    """
+    Puente entre los eventos de libvlc y el hilo de Tk.
+    Los callbacks de libvlc se ejecutan en su propio hilo y no deben tocar Tk; este puente
+    solo copia el evento y lo encola, y el callback registrado se ejecuta en el hilo de Tk.
+    """
+    def __init__(self, root):
+        """
+        Inicializa el puente sobre la ventana dada.
+        """
+        self.bridge = TkBridge(root, self.despachar)
+        self.attached = []
+
+    def attach(self, manager, event_type, callback):
+        """
+        Registra `callback(VlcEvent)` para un tipo de evento; se ejecutará en el hilo de Tk.
+        """
+        manager.event_attach(event_type, self.recibir, callback)
+        self.attached.append((manager, event_type))
+
+    def detach(self, manager, event_type):
+        """
+        Elimina el callback registrado para un tipo de evento.
+        """
+        if (manager, event_type) in self.attached:
+            self.attached.remove((manager, event_type))
+            manager.event_detach(event_type)
+
+    def recibir(self, event, callback):
+        """
+        Se ejecuta en el hilo de libvlc: copia el evento y lo encola sin bloquear.
+        """
+        self.bridge.put((callback, copiar_evento(event)))
+
+    def despachar(self, item):
+        """
+        Se ejecuta en el hilo de Tk: llama al callback registrado.
+        """
+        callback, event = item
+        callback(event)
+
+    def cerrar(self):
+        """
+        Elimina todos los callbacks y cierra el puente.
+        """
+        for manager, event_type in list(self.attached):
+            self.detach(manager, event_type)
+        self.bridge.cerrar()
+
+
+class PlayerService:
+    """
+    Servicio compartido de reproducción basado en libvlc.
+    Mantiene una sola instancia de vlc y reutiliza un MediaPlayer por nombre
+    ("video", "audio", ...) cambiando su medio con set_media en lugar de crear
+    un reproductor nuevo para cada archivo.
+    """
+    def __init__(self, args=None, perfil="predeterminado"):
+        """
+        Crea la instancia de libvlc con el perfil de decodificación y los argumentos indicados;
+        los argumentos se añaden después del perfil y pueden sobrescribirlo.
+        """
+        self.perfil = perfil
+        self.instance = vlc.Instance(argumentos_perfil(perfil) + list(args or []))
+        self.players = {}
+        self.list_players = {}
+        self.lock = Lock()
+
+    def player(self, name="video"):
+        """
+        Devuelve el reproductor con ese nombre, creándolo la primera vez.
+        """
+        with self.lock:
+            if name not in self.players:
+                self.players[name] = self.instance.media_player_new()
+            return self.players[name]
+
+    def list_player(self, name="video"):
+        """
+        Devuelve un reproductor de listas que usa el reproductor con ese nombre, de modo
+        que los elementos de la lista se dibujan sobre la misma superficie de video.
+        """
+        player = self.player(name)
+        with self.lock:
+            if name not in self.list_players:
+                list_player = self.instance.media_list_player_new()
+                list_player.set_media_player(player)
+                self.list_players[name] = list_player
+            return self.list_players[name]
+
+    def play_list(self, paths, name="video", window_id=None, loop=False):
+        """
+        Reproduce una lista de archivos de forma continua y devuelve (list_player, media_list).
+        La lista se devuelve para poder preparar sus elementos por adelantado; quien la
+        recibe debe liberarla con release() al terminar.
+        """
+        list_player = self.list_player(name)
+        list_player.stop()
+        media_list = self.instance.media_list_new(paths)
+        list_player.set_media_list(media_list)
+        list_player.set_playback_mode(vlc.PlaybackMode.loop if loop else vlc.PlaybackMode.default)
+        if window_id is not None:
+            self.set_window(self.player(name), window_id)
+        list_player.play()
+        return list_player, media_list
+
+    def prefetch_metadata(self, media_list, index):
+        """
+        Lee por adelantado los metadatos (duración, pistas) del elemento `index` de una
+        lista. Solo analiza el archivo: no abre el demultiplexor ni el decodificador, así
+        que el cambio al siguiente elemento aún espera a que se abra.
+        """
+        if media_list is None or not 0 <= index < media_list.count():
+            return
+        media = media_list.item_at_index(index)
+        if media is not None:
+            media.parse_with_options(vlc.MediaParseFlag.local | vlc.MediaParseFlag.network, 0)
+            media.release()
+
+    def load(self, player, path, *options):
+        """
+        Carga un archivo en el reproductor y libera la referencia propia al medio;
+        el reproductor conserva la suya mientras lo usa. `options` son opciones de
+        entrada de libvlc para ese medio (por ejemplo ":start-paused").
+        """
+        media = self.instance.media_new(path, *options)
+        player.set_media(media)
+        media.release()
+
+    def set_window(self, player, window_id):
+        """
+        Asigna la ventana de Tk donde se dibuja el video.
+        """
+        if platform.system() == "Linux":
+            player.set_xwindow(window_id)
+        else:
+            player.set_hwnd(window_id)
+
+    def play(self, path, name="video", window_id=None):
+        """
+        Reproduce un archivo en el reproductor indicado y lo devuelve.
+        """
+        player = self.player(name)
+        player.stop()
+        self.load(player, path)
+        if window_id is not None:
+            self.set_window(player, window_id)
+        player.play()
+        return player
+
+    def estadisticas(self, name="video"):
+        """
+        Devuelve los contadores de cuadros del medio actual del reproductor:
+        {"decoded", "displayed", "dropped", "late"}, o None si no hay medio.
+        libvlc 3 no informa los cuadros tardíos; en ese caso "late" es None.
+        """
+        player = self.players.get(name)
+        media = player.get_media() if player else None
+        if media is None:
+            return None
+        try:
+            stats = vlc.MediaStats()
+            if not media.get_stats(stats):
+                return None
+            return {
+                "decoded": stats.i_decoded_video,
+                "displayed": stats.i_displayed_pictures,
+                "dropped": stats.i_lost_pictures,
+                "late": getattr(stats, "i_late_pictures", None),
+            }
+        finally:
+            media.release()
+
+    def registrar_estadisticas(self, name="video"):
+        """
+        Muestra los contadores de cuadros del medio actual junto con el perfil en uso.
+        """
+        stats = self.estadisticas(name)
+        if stats:
+            late = "n/d" if stats["late"] is None else stats["late"]
+            print(f"Perfil {self.perfil}: {stats['decoded']} cuadros decodificados, "
+                  f"{stats['displayed']} mostrados, {stats['dropped']} perdidos, {late} tardíos")
+        return stats
+
+    def release(self):
+        """
+        Detiene y libera todos los reproductores y la instancia de libvlc.
+        """
+        with self.lock:
+            for list_player in self.list_players.values():
+                list_player.stop()
+                list_player.release()
+            self.list_players.clear()
+            for player in self.players.values():
+                player.stop()
+                player.release()
+            self.players.clear()
+            self.instance.release()
+
+
+_service = None
+_service_lock = Lock()
+
+
+def get_player_service():
+    """
+    Devuelve la instancia única del servicio de reproducción.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = PlayerService(perfil=perfil_del_equipo())
+        return _service
+
+
+def benchmark(clip, perfil):
+    """
+    Reproduce un clip sin pantalla con un perfil de decodificación y devuelve
+    el tiempo, el uso de CPU, si terminó con error y los contadores de cuadros.
+    """
+    import resource
+    from time import sleep, perf_counter
+
+    service = PlayerService(["--vout=dummy", "--aout=dummy"], perfil=perfil)
+    uso = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_inicio = uso.ru_utime + uso.ru_stime
+    inicio = perf_counter()
+    player = service.play(clip, "benchmark")
+    while player.get_state() not in (vlc.State.Ended, vlc.State.Error):
+        sleep(0.05)
+    duracion = perf_counter() - inicio
+    uso = resource.getrusage(resource.RUSAGE_SELF)
+    error = player.get_state() == vlc.State.Error
+    stats = service.estadisticas("benchmark") or {}
+    service.release()
+    return {"perfil": perfil, "segundos": duracion, "error": error,
+            "cpu": (uso.ru_utime + uso.ru_stime - cpu_inicio) / duracion * 100, **stats}
+
+
+def rss_mb():
+    """
+    Devuelve la memoria residente del proceso en MB.
+    """
+    import resource
+
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / (1024 * 1024)
+
+
+# Uso:
+#   python vlc_player.py soak CLIP [REPETICIONES]: reproduce muchas veces un clip corto y falla si
+#       el RSS crece más de TOLERANCIA_RSS_MB desde el final del calentamiento
+#   python vlc_player.py benchmark CLIP [PERFIL ...]: compara perfiles de decodificación sin pantalla
+#       y falla si algún perfil no pudo reproducir o no decodificó ningún cuadro
+if __name__ == "__main__":
+    import sys
+    from time import sleep, perf_counter
+
+    TOLERANCIA_RSS_MB = 20
+
+    if len(sys.argv) < 3 or sys.argv[1] not in ("soak", "benchmark"):
+        print("Uso: python vlc_player.py soak CLIP [REPETICIONES]")
+        print("     python vlc_player.py benchmark CLIP [PERFIL ...]")
+        sys.exit(1)
+
+    clip = sys.argv[2]
+    if sys.argv[1] == "benchmark":
+        perfiles = sys.argv[3:] or list(PERFILES_DECODIFICACION)
+        fallidos = []
+        for perfil in perfiles:
+            r = benchmark(clip, perfil)
+            late = r.get("late")
+            print(f"{perfil:15} {r['segundos']:6.1f} s  CPU {r['cpu']:5.1f} %  "
+                  f"decodificados {r.get('decoded', 0)}  mostrados {r.get('displayed', 0)}  "
+                  f"perdidos {r.get('dropped', 0)}  tardíos {'n/d' if late is None else late}")
+            if r["error"] or not r.get("decoded"):
+                fallidos.append(perfil)
+        if fallidos:
+            print(f"Error al reproducir con los perfiles: {', '.join(fallidos)}")
+            sys.exit(1)
+        sys.exit(0)
+
+    repeticiones = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+    calentamiento = max(1, min(100, repeticiones // 10))
+    service = PlayerService(["--vout=dummy", "--aout=dummy"])
+
+    inicio = perf_counter()
+    rss_base = None
+    for i in range(1, repeticiones + 1):
+        player = service.play(clip, "soak")
+        while player.get_state() not in (vlc.State.Ended, vlc.State.Error):
+            sleep(0.01)
+        if i == calentamiento:
+            rss_base = rss_mb()
+            print(f"{i} reproducciones de calentamiento, RSS base {rss_base:.1f} MB")
+        elif i % 100 == 0:
+            print(f"{i} reproducciones, RSS {rss_mb():.1f} MB, {perf_counter() - inicio:.1f} s")
+    service.release()
+
+    crecimiento = rss_mb() - rss_base
+    print(f"Crecimiento del RSS tras el calentamiento: {crecimiento:.1f} MB (máximo {TOLERANCIA_RSS_MB} MB)")
+    if crecimiento > TOLERANCIA_RSS_MB:
+        print("Error: la memoria crece con las reproducciones")
+        sys.exit(1)